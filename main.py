@@ -6,11 +6,9 @@ based on raw materials and product specifications, then simulates them using DWS
 """
 
 import argparse
+import asyncio
 import os
-import yaml
 import logging
-from src.agent.process_designer import ProcessDesignerAgent
-from src.utils.data_handler import DataHandler
 from src.utils.logger import setup_logger
 
 def parse_arguments():
@@ -22,7 +20,7 @@ def parse_arguments():
         "--raw-materials",
         type=str,
         required=True,
-        help="Path to JSON file containing raw materials"
+        help="Path to JSON file containing raw materials, or a directory of such files to design one process per file"
     )
     parser.add_argument(
         "--product-specs",
@@ -64,6 +62,11 @@ def main():
     """Main execution function."""
     args = parse_arguments()
     
+    # Deferred so that --help and argument errors return without importing
+    # the YAML parser and the agent stack (openai, httpx, pydantic)
+    import yaml
+    from src.utils.data_handler import DataHandler
+    
     # Set up logging
     log_level = logging.DEBUG if args.verbose else logging.INFO
     logger = setup_logger(log_level)
@@ -77,7 +80,9 @@ def main():
     # Load configuration
     try:
         with open(args.config, 'r') as config_file:
-            config = yaml.safe_load(config_file)
+            # Same safe subset of YAML as yaml.safe_load, using the libyaml
+            # C loader when PyYAML was built with it
+            config = yaml.load(config_file, Loader=getattr(yaml, "CSafeLoader", yaml.SafeLoader))
             logger.info(f"Loaded configuration from {args.config}")
     except Exception as e:
         logger.error(f"Error loading configuration: {e}")
@@ -95,35 +100,94 @@ def main():
     # Load input data
     data_handler = DataHandler()
     try:
-        raw_materials = data_handler.load_raw_materials(args.raw_materials)
+        if os.path.isdir(args.raw_materials):
+            raw_material_files = sorted(
+                os.path.join(args.raw_materials, name)
+                for name in os.listdir(args.raw_materials)
+                if name.endswith(".json")
+            )
+        else:
+            raw_material_files = [args.raw_materials]
+        
+        scenarios = {}
+        for path in raw_material_files:
+            scenario_name = os.path.splitext(os.path.basename(path))[0]
+            scenarios[scenario_name] = data_handler.load_raw_materials(path)
         product_specs = data_handler.load_product_specs(args.product_specs)
     except Exception as e:
         logger.error(f"Error loading input data: {e}")
         return
     
-    logger.info(f"Loaded {len(raw_materials)} raw materials and {len(product_specs)} product specifications")
+    if not scenarios:
+        logger.error(f"No raw materials files found in {args.raw_materials}")
+        return
+    
+    logger.info(f"Loaded {len(scenarios)} raw materials scenario(s) and {len(product_specs)} product specifications")
     
-    # Initialize and run the agent
+    # Initialize and run the agents
     try:
-        agent = ProcessDesignerAgent(
+        asyncio.run(main_async(config, scenarios, product_specs, args.output_dir, logger))
+    except Exception as e:
+        logger.error(f"Error during process design: {e}")
+        return
+
+async def main_async(
+    config: dict,
+    scenarios: dict,
+    product_specs: dict,
+    output_dir: str,
+    logger: logging.Logger
+) -> None:
+    """Design a process for every raw materials scenario concurrently."""
+    from src.agent.process_designer import ProcessDesignerAgent
+    
+    agents = {}
+    for scenario_name, raw_materials in scenarios.items():
+        # Keep each scenario's runs apart when designing several at once
+        scenario_output_dir = output_dir if len(scenarios) == 1 else os.path.join(output_dir, scenario_name)
+        agents[scenario_name] = ProcessDesignerAgent(
             config=config,
             raw_materials=raw_materials,
             product_specs=product_specs,
-            output_dir=args.output_dir
+            output_dir=scenario_output_dir
         )
-        
-        success = agent.run()
-        
-        if success:
-            logger.info("Process design completed successfully!")
-            logger.info(f"Final results saved to {args.output_dir}")
+    
+    # Request all first-iteration designs in a single batch if configured
+    initial_designs = {}
+    if config["agent"].get("use_batch_api", False):
+        model_manager = next(iter(agents.values())).model_manager
+        requests = [(name, agent.build_design_request()) for name, agent in agents.items()]
+        try:
+            batch_id = await asyncio.to_thread(model_manager.submit_batch, requests)
+            responses = await asyncio.to_thread(
+                model_manager.wait_for_batch,
+                batch_id,
+                poll=config["agent"].get("batch_poll_interval", 30)
+            )
+            initial_designs = {
+                name: model_manager.parse_process_design(content)
+                for name, content in responses.items()
+            }
+        except Exception as e:
+            # Each agent then requests its first design directly
+            logger.error(f"Initial design batch failed, requesting designs directly: {e}")
+            initial_designs = {}
+    
+    results = await asyncio.gather(
+        *[agent.run(initial_design=initial_designs.get(name)) for name, agent in agents.items()],
+        return_exceptions=True
+    )
+    
+    for (scenario_name, agent), result in zip(agents.items(), results):
+        prefix = f"[{scenario_name}] " if len(agents) > 1 else ""
+        if isinstance(result, Exception):
+            logger.error(f"{prefix}Error during process design: {result}")
+        elif result:
+            logger.info(f"{prefix}Process design completed successfully!")
+            logger.info(f"{prefix}Final results saved to {agent.output_dir}")
         else:
-            logger.warning("Process design did not fully meet specifications within the iteration limit")
-            logger.info(f"Best attempt results saved to {args.output_dir}")
-            
-    except Exception as e:
-        logger.error(f"Error during process design: {e}")
-        return
+            logger.warning(f"{prefix}Process design did not fully meet specifications within the iteration limit")
+            logger.info(f"{prefix}Best attempt results saved to {agent.output_dir}")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,93 @@
+"""
+Persistent cache for model responses.
+
+Stores responses in SQLite so that identical requests are answered from
+disk across runs of the agent, not only within a single process.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+from src.utils.logger import get_logger
+
+class PersistentLLMCache:
+    """
+    SQLite-backed store of model responses keyed by request hash.
+    """
+
+    def __init__(self, path: str, ttl: float = 3600.0):
+        """
+        Open (or create) the cache database.
+
+        Args:
+            path: Path to the SQLite database file
+            ttl: Maximum age of a cached response in seconds
+        """
+        self.logger = get_logger(__name__)
+        self.path = path
+        self.ttl = ttl
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        # WAL lets several concurrent runs read while one writes
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, "
+            "response TEXT NOT NULL, "
+            "ts REAL NOT NULL, "
+            "method TEXT)"
+        )
+        self._conn.commit()
+        self.logger.info(f"Opened persistent response cache at {path}")
+
+    def lookup(self, key: str) -> Optional[str]:
+        """
+        Return the cached response for a request key, if present and fresh.
+
+        Args:
+            key: Request hash
+
+        Returns:
+            Optional[str]: Cached response content, or None on a miss
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, ts FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+
+        if row is None:
+            return None
+
+        response, timestamp = row
+        if time.time() - timestamp >= self.ttl:
+            return None
+        return response
+
+    def update(self, key: str, response: str, method: str = "") -> None:
+        """
+        Store a response under a request key.
+
+        Args:
+            key: Request hash
+            response: Response content
+            method: Name of the model call that produced the response
+        """
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, response, ts, method) VALUES (?, ?, ?, ?)",
+                (key, response, time.time(), method)
+            )
+            self._conn.commit()
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
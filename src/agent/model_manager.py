@@ -2,12 +2,460 @@
 Model Manager module for handling interactions with OpenAI models.
 """
 
+import asyncio
+import copy
+import functools
+import hashlib
 import json
 import logging
-from typing import Dict, Any, List, Optional, Union
+import os
+import re
+import tempfile
+import time
+import warnings
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Dict, Any, List, Optional, Tuple, Union
 
-from openai import OpenAI
+from src.agent.llm_cache import PersistentLLMCache
+from src.utils import json_utils
 from src.utils.logger import get_logger
+from src.utils.retry import async_retry
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI, OpenAI
+
+# Static task instructions. These are plain string constants (assembled once at
+# import, never formatted per call) so the system prefix of every request is
+# byte-identical across iterations, which lets the provider's automatic prompt
+# caching reuse it.
+_ANALYSIS_SCHEMA = """
+{
+  "assessment": "Overall assessment of the process performance",
+  "issues": [
+    {
+      "description": "Issue description",
+      "severity": "high/medium/low",
+      "related_to": "unit-id or stream-id or general"
+    }
+  ],
+  "recommendations": [
+    {
+      "description": "Recommendation description",
+      "target": "unit-id or stream-id or general",
+      "expected_impact": "Description of expected improvement"
+    }
+  ],
+  "priority_actions": ["First action", "Second action", ...]
+}
+"""
+
+_IMPROVEMENT_SCHEMA = """
+{
+  "summary": "Summary of key issues and approach to improvements",
+  "unit_operation_changes": [
+    {
+      "unit_id": "unit-id",
+      "parameter": "parameter name",
+      "current_value": current value,
+      "suggested_value": suggested value,
+      "rationale": "Reason for the change"
+    }
+  ],
+  "stream_changes": [
+    {
+      "stream_id": "stream-id",
+      "parameter": "parameter name",
+      "current_value": current value,
+      "suggested_value": suggested value,
+      "rationale": "Reason for the change"
+    }
+  ],
+  "structural_changes": [
+    {
+      "type": "add/remove/modify",
+      "description": "Description of the structural change",
+      "rationale": "Reason for the change"
+    }
+  ]
+}
+"""
+
+_ANALYSIS_AND_IMPROVEMENT_INSTRUCTIONS = """
+# Chemical Process Simulation Analysis and Design Improvement
+
+You will receive the current process design with its simulation results and the product
+specifications, the feedback from its previous simulation, or both.
+
+Please analyze the simulation results and provide:
+1. An assessment of how well the process meets product specifications
+2. Identification of any constraint violations or inefficiencies
+3. Specific recommendations for improving the process design
+4. A priority ranking of the issues that need to be addressed
+
+Then, based on your analysis, suggest specific improvements to the process design.
+Focus on addressing the most critical issues first, and include:
+1. A summary of the key issues that need to be addressed
+2. Specific changes to unit operations (parameters, configurations)
+3. Specific changes to process streams (flow rates, compositions)
+4. Rationale for each suggested change
+
+Format your response as a JSON object with exactly two keys:
+- "analysis": an object with the following structure:
+```json""" + _ANALYSIS_SCHEMA + """```
+- "improvements": an object with the following structure:
+```json""" + _IMPROVEMENT_SCHEMA + "```\n"
+
+# Outermost JSON object embedded in a response
+_JSON_OBJECT_RE = re.compile(r"\{.*\}", re.DOTALL)
+
+# Section headers of the per-call user messages
+_DESIGN_HEADER = "\n## Current Process Design\n"
+_SIMULATION_RESULTS_HEADER = "\n\n## Simulation Results\n"
+_PRODUCT_SPECS_HEADER = "\n\n## Product Specifications\n"
+_FEEDBACK_HEADER = "\n\n## Feedback from Previous Simulation\n"
+_REFS_HEADER = '\n\n## Shared Values\nWhere the simulation results contain {"$ref": "X"}, substitute the list under "X" below.\n'
+_ANALYSIS_AND_IMPROVEMENT_HEADER_TMPL = "\n# Simulation Analysis and Design Improvement (Iteration {iteration}/{max_iterations})\n"
+
+# Output budget per model call. max_tokens follows an exponential moving
+# average of recent response lengths, seeded per call type, so requests do not
+# reserve far more completion capacity than they use.
+_OUTPUT_TOKEN_SEEDS = {
+    "design": 1024,
+    "analysis_and_improvement": 1280
+}
+_OUTPUT_TOKEN_EMA_ALPHA = 0.3
+_OUTPUT_TOKEN_HEADROOM = 1.5
+_MIN_OUTPUT_TOKENS = 256
+_MAX_OUTPUT_TOKENS = 4000
+
+# Number of parsed analysis/improvement results remembered per manager
+_RESULT_MEMO_SIZE = 64
+
+# Shortest prompt prefix the provider caches automatically
+_PROMPT_CACHE_MIN_TOKENS = 1024
+
+# Fields of the DWSIM simulation results that are relevant for analysis.
+# True keeps a value as is, "*" applies a schema to every entry of a mapping.
+_SIM_RESULT_WHITELIST = {
+    "status": True,
+    "message": True,
+    "streams": {
+        "*": {
+            "from": True,
+            "to": True,
+            "phase": True,
+            "temperature": True,
+            "temperature_unit": True,
+            "pressure": True,
+            "pressure_unit": True,
+            "total_flow": True,
+            "flow_unit": True,
+            "components": {
+                "*": {"mole_fraction": True, "mole_flow": True}
+            }
+        }
+    },
+    "unit_operations": {
+        "*": {"type": True, "inputs": True, "outputs": True, "parameters": True}
+    },
+    "mass_balance": True,
+    "energy_balance": True
+}
+
+def _project(data: Any, schema: Any) -> Any:
+    """
+    Keep only the whitelisted fields of a nested structure and round its floats
+    to 4 significant figures, which trims prompt tokens without losing meaning.
+    
+    Args:
+        data: Structure to project
+        schema: Whitelist (see _SIM_RESULT_WHITELIST)
+        
+    Returns:
+        The projected copy of the data
+    """
+    if isinstance(data, float):
+        return float(f"{data:.4g}")
+    if isinstance(data, list):
+        return [_project(item, schema) for item in data]
+    if not isinstance(data, dict):
+        return data
+    if schema is True:
+        return {key: _project(value, True) for key, value in data.items()}
+    if "*" in schema:
+        return {key: _project(value, schema["*"]) for key, value in data.items()}
+    return {key: _project(data[key], sub_schema) for key, sub_schema in schema.items() if key in data}
+
+# Numeric lists at least this long are replaced by a reference when repeated
+_REF_MIN_LENGTH = 4
+
+def _is_numeric_list(value: Any) -> bool:
+    """Return True for a list of at least _REF_MIN_LENGTH plain numbers."""
+    return (
+        isinstance(value, list)
+        and len(value) >= _REF_MIN_LENGTH
+        and all(isinstance(item, (int, float)) and not isinstance(item, bool) for item in value)
+    )
+
+def _reference_repeats(data: Any) -> Tuple[Dict[str, List[float]], Any]:
+    """
+    Replace numeric lists that occur more than once by {"$ref": id} entries.
+    
+    Repeated composition vectors are common in distillation and reactor
+    results; emitting each one once shrinks the prompt considerably.
+    
+    Args:
+        data: Structure to compress (typically projected simulation results)
+        
+    Returns:
+        Tuple: Reference table keyed by id, and the compressed copy of the data
+    """
+    counts: Dict[str, int] = {}
+    
+    def count(node: Any) -> None:
+        if _is_numeric_list(node):
+            frozen = json_utils.dumps(node)
+            counts[frozen] = counts.get(frozen, 0) + 1
+        elif isinstance(node, list):
+            for item in node:
+                count(item)
+        elif isinstance(node, dict):
+            for value in node.values():
+                count(value)
+    
+    count(data)
+    refs: Dict[str, List[float]] = {}
+    ids = {}
+    for frozen, occurrences in counts.items():
+        if occurrences > 1:
+            ref_id = hashlib.sha1(frozen.encode("utf-8")).hexdigest()[:8]
+            ids[frozen] = ref_id
+            refs[ref_id] = json_utils.loads(frozen)
+    if not refs:
+        return refs, data
+    
+    def replace(node: Any) -> Any:
+        if _is_numeric_list(node):
+            ref_id = ids.get(json_utils.dumps(node))
+            return {"$ref": ref_id} if ref_id is not None else node
+        if isinstance(node, list):
+            return [replace(item) for item in node]
+        if isinstance(node, dict):
+            return {key: replace(value) for key, value in node.items()}
+        return node
+    
+    return refs, replace(data)
+
+@functools.lru_cache(maxsize=8)
+def _encoding(model: str) -> Any:
+    """
+    Return the tiktoken encoding for a model, loaded once per model.
+    
+    Args:
+        model: The OpenAI model name
+        
+    Returns:
+        tiktoken.Encoding, or None when tiktoken is not installed
+    """
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        # Models newer than the installed tiktoken use the latest encoding
+        return tiktoken.get_encoding("o200k_base")
+
+def _count_tokens(text: str, model: str) -> int:
+    """
+    Count the tokens of a text, estimating ~4 characters per token without tiktoken.
+    
+    Args:
+        text: Text to count
+        model: The OpenAI model name
+        
+    Returns:
+        int: Number of tokens
+    """
+    encoding = _encoding(model)
+    if encoding is None:
+        return len(text) // 4
+    return len(encoding.encode(text))
+
+def _freeze(data: Any) -> str:
+    """Return a canonical, hashable form of JSON-serializable input data."""
+    return json_utils.dumps(data, sort_keys=True)
+
+def _analysis_and_improvement_key(
+    simulation_results: Dict[str, Any],
+    design: Dict[str, Any],
+    product_specs: Dict[str, Any],
+    iteration: int,
+    max_iterations: int,
+    feedback: Optional[Dict[str, Any]]
+) -> Tuple[str, ...]:
+    """Return the memo key of a combined analysis and improvement request."""
+    return (
+        "analysis_and_improvement", _freeze(simulation_results), _freeze(design),
+        _freeze(product_specs), str(iteration), str(max_iterations), _freeze(feedback)
+    )
+
+def _is_transient_error(error: BaseException) -> bool:
+    """Return True for OpenAI errors worth retrying (rate limits, timeouts, connection failures)."""
+    # openai is already imported once a request has been made
+    import openai
+    return isinstance(error, (openai.RateLimitError, openai.APITimeoutError, openai.APIConnectionError))
+
+# Shared clients keyed by (api_key, organization, asynchronous)
+_CLIENT_CACHE: Dict[Tuple[str, str, bool], Union["OpenAI", "AsyncOpenAI"]] = {}
+
+def _get_client(api_key: str, organization: str = "", asynchronous: bool = False) -> Union["OpenAI", "AsyncOpenAI"]:
+    """
+    Return a shared OpenAI client for the given credentials.
+    
+    Sharing the client shares its HTTP connection pool, so connections stay
+    warm across iterations and across agents instead of each manager paying
+    for its own TCP/TLS setup.
+    
+    Args:
+        api_key: OpenAI API key
+        organization: OpenAI organization ID (optional)
+        asynchronous: Return an AsyncOpenAI client instead of an OpenAI client
+        
+    Returns:
+        OpenAI or AsyncOpenAI client
+    """
+    key = (api_key, organization, asynchronous)
+    client = _CLIENT_CACHE.get(key)
+    if client is not None:
+        return client
+    
+    # Imported on first use: openai pulls in httpx, pydantic and anyio, which
+    # dominates the import time of this module
+    import httpx
+    from openai import AsyncOpenAI, OpenAI
+    
+    client_kwargs = {"api_key": api_key}
+    if organization:
+        client_kwargs["organization"] = organization
+    
+    http_client_class = httpx.AsyncClient if asynchronous else httpx.Client
+    http_kwargs = {
+        "limits": httpx.Limits(max_keepalive_connections=32, max_connections=64),
+        "timeout": 60.0
+    }
+    try:
+        # HTTP/2 multiplexes concurrent requests over one connection (requires h2)
+        http_client = http_client_class(http2=True, **http_kwargs)
+    except ImportError:
+        http_client = http_client_class(**http_kwargs)
+    
+    client_class = AsyncOpenAI if asynchronous else OpenAI
+    client = client_class(http_client=http_client, **client_kwargs)
+    _CLIENT_CACHE[key] = client
+    return client
+
+# Shared rate limiters keyed by (api_key, organization); the limits apply per
+# account, so every manager using the same credentials must draw from one bucket
+_BUCKET_CACHE: Dict[Tuple[str, str], "TokenBucket"] = {}
+
+def _get_bucket(api_key: str, organization: str, requests_per_min: float, tokens_per_min: float) -> "TokenBucket":
+    """
+    Return the shared token bucket for the given credentials.
+    
+    The limits of the first caller are used; later callers with the same
+    credentials share that bucket.
+    
+    Args:
+        api_key: OpenAI API key
+        organization: OpenAI organization ID
+        requests_per_min: Request rate limit to stay under
+        tokens_per_min: Token rate limit to stay under
+        
+    Returns:
+        TokenBucket: The shared bucket
+    """
+    key = (api_key, organization)
+    bucket = _BUCKET_CACHE.get(key)
+    if bucket is None:
+        bucket = TokenBucket(requests_per_min, tokens_per_min)
+        _BUCKET_CACHE[key] = bucket
+    return bucket
+
+class _JSONObjectScanner:
+    """
+    Tracks the brace depth of a streamed JSON object to detect when the
+    top-level object is complete. Braces inside strings are ignored.
+    """
+    
+    def __init__(self):
+        """Initialize the scanner."""
+        self.depth = 0
+        self.in_string = False
+        self.escaped = False
+    
+    def feed(self, text: str) -> bool:
+        """
+        Consume the next piece of streamed text.
+        
+        Args:
+            text: Next fragment of the response
+            
+        Returns:
+            bool: True once the top-level object has been closed
+        """
+        for char in text:
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif char == "\\":
+                    self.escaped = True
+                elif char == '"':
+                    self.in_string = False
+            elif char == '"':
+                self.in_string = True
+            elif char == "{":
+                self.depth += 1
+            elif char == "}":
+                self.depth -= 1
+                if self.depth == 0:
+                    return True
+        return False
+
+class _StreamCollector:
+    """
+    Collects the content of a streamed chat completion until the top-level
+    JSON object is complete.
+    """
+    
+    def __init__(self):
+        """Initialize the collector."""
+        self.scanner = _JSONObjectScanner()
+        self.parts: List[str] = []
+    
+    def add(self, chunk: Any) -> bool:
+        """
+        Consume the next chunk of the stream.
+        
+        Args:
+            chunk: Next streamed chat completion chunk
+            
+        Returns:
+            bool: True once the top-level object has been closed
+        """
+        if not chunk.choices or not chunk.choices[0].delta.content:
+            return False
+        self.parts.append(chunk.choices[0].delta.content)
+        return self.scanner.feed(self.parts[-1])
+    
+    @property
+    def content(self) -> str:
+        """Content received so far."""
+        return "".join(self.parts)
 
 class OpenAIModelManager:
     """
@@ -20,7 +468,10 @@ class OpenAIModelManager:
         api_key: str,
         organization: str = "",
         temperature: float = 0.2,
-        system_message: str = ""
+        system_message: str = "",
+        cache_enabled: bool = False,
+        cache_ttl: float = 3600.0,
+        cache: Optional[PersistentLLMCache] = None
     ):
         """
         Initialize the OpenAI model manager.
@@ -31,24 +482,354 @@ class OpenAIModelManager:
             organization: OpenAI organization ID (optional)
             temperature: Model temperature (0.0 to 1.0)
             system_message: System message to guide the model's responses
+            cache_enabled: Reuse responses for identical requests (only when temperature is 0)
+            cache_ttl: Maximum age of a cached response in seconds
+            cache: Persistent cache shared across runs (optional, requires cache_enabled)
         """
         self.logger = get_logger(__name__)
         self.model = model
         self.temperature = temperature
         self.system_message = system_message
+        self._analysis_and_improvement_system_message = system_message + _ANALYSIS_AND_IMPROVEMENT_INSTRUCTIONS
+        
+        # Cached responses are only valid when sampling is deterministic
+        self.cache_enabled = cache_enabled and temperature == 0
+        self.cache_ttl = cache_ttl
+        self.cache = cache if self.cache_enabled else None
+        self._response_cache: Dict[str, Tuple[str, float]] = {}
+        self._avg_output_tokens: Dict[str, float] = dict(_OUTPUT_TOKEN_SEEDS)
+        self._system_prefix_tokens: Dict[str, int] = {}
+        self._result_memo: "OrderedDict[Tuple[str, ...], Dict[str, Any]]" = OrderedDict()
+        if cache_enabled and not self.cache_enabled:
+            self.logger.warning("Response caching requires temperature 0, caching disabled")
         
         # Initialize OpenAI client
-        client_kwargs = {"api_key": api_key}
-        if organization:
-            client_kwargs["organization"] = organization
-            
         try:
-            self.client = OpenAI(**client_kwargs)
+            self.client = _get_client(api_key, organization)
             self.logger.info(f"Initialized OpenAI client with model {model}")
         except Exception as e:
             self.logger.error(f"Error initializing OpenAI client: {e}")
             raise
     
+    def _request_body(self, messages: List[Dict[str, str]], max_tokens: int) -> Dict[str, Any]:
+        """
+        Build the body of a JSON-mode chat completion request.
+        
+        Args:
+            messages: Chat messages sent to the model
+            max_tokens: Maximum number of tokens to generate
+            
+        Returns:
+            Dict: Request body accepted by the chat completions endpoint
+        """
+        return {
+            "model": self.model,
+            "messages": messages,
+            "temperature": self.temperature,
+            "response_format": {"type": "json_object"},
+            "max_tokens": max_tokens
+        }
+    
+    def _cache_key(self, messages: List[Dict[str, str]]) -> str:
+        """
+        Build a stable cache key for a chat completion request.
+        
+        max_tokens is not part of the key: it varies with the predicted
+        response length, and only complete responses are cached.
+        
+        Args:
+            messages: Chat messages sent to the model
+            
+        Returns:
+            str: SHA-256 hex digest identifying the request
+        """
+        payload = json.dumps(
+            {
+                "model": self.model,
+                "messages": messages,
+                "temperature": self.temperature
+            },
+            sort_keys=True
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    
+    def _cache_lookup(self, key: Optional[str]) -> Optional[str]:
+        """
+        Return the cached response content for a request key, if still fresh.
+        
+        Args:
+            key: Cache key of the request (None when caching is disabled)
+            
+        Returns:
+            Optional[str]: Cached content, or None on a miss
+        """
+        if key is None:
+            return None
+        
+        cached = self._response_cache.get(key)
+        if cached is not None:
+            content, timestamp = cached
+            if time.time() - timestamp < self.cache_ttl:
+                self.logger.debug("Using cached model response")
+                return content
+            del self._response_cache[key]
+        
+        # Fall back to responses persisted by earlier runs
+        if self.cache is not None:
+            content = self.cache.lookup(key)
+            if content is not None:
+                self.logger.debug("Using persisted model response")
+                return content
+        
+        return None
+    
+    def _cache_store(self, key: Optional[str], content: str, method: str = "") -> None:
+        """Store response content under a request key (no-op when caching is disabled)."""
+        if key is None:
+            return
+        
+        self._response_cache[key] = (content, time.time())
+        if self.cache is not None:
+            self.cache.update(key, content, method)
+    
+    def _prefix_tokens(self, system_content: str) -> int:
+        """
+        Return the token count of a system prefix, tokenizing each distinct prefix only once.
+        
+        Args:
+            system_content: Content of the system message
+            
+        Returns:
+            int: Number of tokens in the system message
+        """
+        tokens = self._system_prefix_tokens.get(system_content)
+        if tokens is None:
+            tokens = _count_tokens(system_content, self.model)
+            self._system_prefix_tokens[system_content] = tokens
+            if tokens < _PROMPT_CACHE_MIN_TOKENS:
+                self.logger.debug(
+                    f"System prefix of {tokens} tokens is below the {_PROMPT_CACHE_MIN_TOKENS}-token "
+                    f"prompt caching minimum"
+                )
+        return tokens
+    
+    def _memo_get(self, key: Tuple[str, ...]) -> Optional[Dict[str, Any]]:
+        """
+        Return the remembered result of an identical earlier call, if any.
+        
+        Unlike the response cache this applies at any temperature, so retries
+        with unchanged inputs within a run do not repeat the request.
+        
+        Args:
+            key: Method name followed by the frozen call inputs
+            
+        Returns:
+            Optional[Dict]: Copy of the remembered result, or None on a miss
+        """
+        result = self._result_memo.get(key)
+        if result is None:
+            return None
+        self._result_memo.move_to_end(key)
+        self.logger.debug(f"Reusing result of an identical {key[0]} request")
+        # Callers may mutate the result, so never hand out the stored object
+        return copy.deepcopy(result)
+    
+    def _memo_put(self, key: Tuple[str, ...], result: Dict[str, Any]) -> None:
+        """Remember a copy of the result of a call, evicting the least recently used entry when full."""
+        self._result_memo[key] = copy.deepcopy(result)
+        self._result_memo.move_to_end(key)
+        if len(self._result_memo) > _RESULT_MEMO_SIZE:
+            self._result_memo.popitem(last=False)
+    
+    def _max_tokens_for(self, method: str) -> int:
+        """
+        Predict the completion budget for a model call from recent response lengths.
+        
+        Args:
+            method: Name of the calling method
+            
+        Returns:
+            int: Value for max_tokens
+        """
+        average = self._avg_output_tokens.get(method)
+        if average is None:
+            return _MAX_OUTPUT_TOKENS
+        return int(min(_MAX_OUTPUT_TOKENS, max(_MIN_OUTPUT_TOKENS, _OUTPUT_TOKEN_HEADROOM * average)))
+    
+    def _record_output_tokens(self, method: str, content: str) -> None:
+        """
+        Update the moving average of response lengths for a model call.
+        
+        Args:
+            method: Name of the calling method
+            content: Content of the model response
+        """
+        if not method:
+            return
+        # Streamed responses carry no usage, so estimate ~4 characters per token
+        tokens = len(content) / 4
+        average = self._avg_output_tokens.get(method, tokens)
+        self._avg_output_tokens[method] = average + _OUTPUT_TOKEN_EMA_ALPHA * (tokens - average)
+    
+    def _cached_create(self, messages: List[Dict[str, str]], max_tokens: Optional[int] = None, method: str = "") -> str:
+        """
+        Request a JSON chat completion, reusing the cached content of identical requests.
+        
+        Args:
+            messages: Chat messages sent to the model
+            max_tokens: Maximum number of tokens to generate (predicted from recent responses when None)
+            method: Name of the calling method, recorded with persisted responses
+            
+        Returns:
+            str: Content of the model response
+        """
+        key, content, max_tokens = self._prepare_create(messages, max_tokens, method)
+        if content is not None:
+            return content
+        
+        stream = self.client.chat.completions.create(**self._request_body(messages, max_tokens), stream=True)
+        content = self._consume_stream(stream)
+        if self._is_truncated(content, max_tokens):
+            stream = self.client.chat.completions.create(**self._request_body(messages, _MAX_OUTPUT_TOKENS), stream=True)
+            content = self._consume_stream(stream)
+        
+        return self._finish_create(key, content, method)
+    
+    def _prepare_create(
+        self,
+        messages: List[Dict[str, str]],
+        max_tokens: Optional[int],
+        method: str
+    ) -> Tuple[Optional[str], Optional[str], int]:
+        """
+        Look up the cached content of a chat completion request and settle its budget.
+        
+        Args:
+            messages: Chat messages sent to the model
+            max_tokens: Maximum number of tokens to generate (predicted from recent responses when None)
+            method: Name of the calling method
+            
+        Returns:
+            Tuple: Cache key (None when caching is disabled), cached content
+                (None on a miss) and the value for max_tokens
+        """
+        key = self._cache_key(messages) if self.cache_enabled else None
+        content = self._cache_lookup(key)
+        if max_tokens is None:
+            max_tokens = self._max_tokens_for(method)
+        return key, content, max_tokens
+    
+    def _is_truncated(self, content: str, max_tokens: int) -> bool:
+        """
+        Check whether a predicted completion budget cut a response short.
+        
+        Args:
+            content: Content of the model response
+            max_tokens: Value of max_tokens the response was requested with
+            
+        Returns:
+            bool: True if the request should be retried with the full budget
+        """
+        if _JSONObjectScanner().feed(content) or max_tokens >= _MAX_OUTPUT_TOKENS:
+            return False
+        self.logger.warning(f"Response truncated at {max_tokens} tokens, retrying with {_MAX_OUTPUT_TOKENS}")
+        return True
+    
+    def _finish_create(self, key: Optional[str], content: str, method: str) -> str:
+        """
+        Record the length of a response and cache it if it is complete.
+        
+        Args:
+            key: Cache key of the request (None when caching is disabled)
+            content: Content of the model response
+            method: Name of the calling method, recorded with persisted responses
+            
+        Returns:
+            str: The content, unchanged
+        """
+        self._record_output_tokens(method, content)
+        if _JSONObjectScanner().feed(content):
+            self._cache_store(key, content, method)
+        return content
+    
+    def _consume_stream(self, stream) -> str:
+        """
+        Read a streamed JSON response, stopping as soon as the top-level object is complete.
+        
+        Args:
+            stream: Streaming chat completion response
+            
+        Returns:
+            str: Content of the model response
+        """
+        collector = _StreamCollector()
+        try:
+            for chunk in stream:
+                if collector.add(chunk):
+                    break
+        finally:
+            stream.close()
+        return collector.content
+    
+    def _parse_json_response(self, result: str, fallback_key: str) -> Dict[str, Any]:
+        """
+        Parse the JSON content of a model response.
+        
+        Args:
+            result: Raw content returned by the model
+            fallback_key: Key under which to return the raw content if it is not valid JSON
+            
+        Returns:
+            Dict: Parsed response
+        """
+        try:
+            # Try to parse as JSON
+            return json_utils.loads(result)
+        except json.JSONDecodeError:
+            pass
+        
+        # Without JSON mode, models may wrap the object in prose or code fences
+        match = _JSON_OBJECT_RE.search(result)
+        if match:
+            try:
+                return json_utils.loads(match.group(0))
+            except json.JSONDecodeError:
+                pass
+        
+        self.logger.warning(f"Failed to parse model response as JSON, returning raw response as '{fallback_key}'")
+        return {fallback_key: result}
+    
+    def _design_messages(self, context: str) -> List[Dict[str, str]]:
+        """Build the chat messages for a process design request."""
+        return [
+            {"role": "system", "content": self.system_message},
+            {"role": "user", "content": context}
+        ]
+    
+    def design_request_body(self, context: str) -> Dict[str, Any]:
+        """
+        Build the request body for a process design, e.g. for submission in a batch.
+        
+        Args:
+            context: String containing raw materials, product specifications, and requirements
+            
+        Returns:
+            Dict: Chat completion request body
+        """
+        return self._request_body(self._design_messages(context), max_tokens=_MAX_OUTPUT_TOKENS)
+    
+    def parse_process_design(self, result: str) -> Dict[str, Any]:
+        """
+        Parse the content of a process design response.
+        
+        Args:
+            result: Raw content returned by the model
+            
+        Returns:
+            Dict: Process design as a structured dictionary
+        """
+        return self._parse_json_response(result, "design_description")
+    
     def generate_process_design(self, context: str) -> Dict[str, Any]:
         """
         Generate a process design based on the provided context.
@@ -62,34 +843,149 @@ class OpenAIModelManager:
         self.logger.info(f"Generating process design using {self.model}")
         
         try:
-            messages = [
-                {"role": "system", "content": self.system_message},
-                {"role": "user", "content": context}
-            ]
-            
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=messages,
-                temperature=self.temperature,
-                response_format={"type": "json_object"},
-                max_tokens=4000
-            )
-            
-            # Extract and parse the response
-            result = response.choices[0].message.content
-            
-            try:
-                # Try to parse as JSON
-                process_design = json.loads(result)
-                return process_design
-            except json.JSONDecodeError:
-                self.logger.warning("Failed to parse model response as JSON, returning raw response")
-                return {"design_description": result}
+            result = self._cached_create(self._design_messages(context), method="design")
+            return self.parse_process_design(result)
                 
         except Exception as e:
             self.logger.error(f"Error generating process design: {e}")
             return {"error": str(e)}
     
+    def submit_batch(self, requests: List[Tuple[str, Dict[str, Any]]]) -> str:
+        """
+        Submit chat completion requests through the OpenAI Batch API.
+        
+        Batched requests are billed at a discount and do not count against the
+        real-time rate limits, at the cost of completing asynchronously (within 24h).
+        
+        Args:
+            requests: List of (custom_id, request body) pairs
+            
+        Returns:
+            str: ID of the created batch
+        """
+        self.logger.info(f"Submitting batch of {len(requests)} requests")
+        
+        fd, input_path = tempfile.mkstemp(prefix="batch_input_", suffix=".jsonl")
+        try:
+            with os.fdopen(fd, "w") as f:
+                for custom_id, body in requests:
+                    line = {
+                        "custom_id": custom_id,
+                        "method": "POST",
+                        "url": "/v1/chat/completions",
+                        "body": body
+                    }
+                    f.write(json_utils.dumps(line) + "\n")
+            
+            with open(input_path, "rb") as f:
+                input_file = self.client.files.create(file=f, purpose="batch")
+        finally:
+            os.remove(input_path)
+        
+        batch = self.client.batches.create(
+            input_file_id=input_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h"
+        )
+        self.logger.info(f"Created batch {batch.id}")
+        return batch.id
+    
+    def wait_for_batch(self, batch_id: str, poll: float = 30) -> Dict[str, str]:
+        """
+        Wait for a batch to complete and collect its responses.
+        
+        Args:
+            batch_id: ID returned by submit_batch
+            poll: Polling interval in seconds
+            
+        Returns:
+            Dict: Response content keyed by custom_id (failed requests are omitted)
+            
+        Raises:
+            RuntimeError: If the batch fails, expires or is cancelled
+        """
+        while True:
+            batch = self.client.batches.retrieve(batch_id)
+            if batch.status == "completed":
+                break
+            if batch.status in ("failed", "expired", "cancelled"):
+                self.logger.error(f"Batch {batch_id} ended with status {batch.status}")
+                raise RuntimeError(f"Batch {batch_id} ended with status {batch.status}")
+            self.logger.debug(f"Batch {batch_id} status: {batch.status}")
+            time.sleep(poll)
+        
+        results = {}
+        if not batch.output_file_id:
+            self.logger.warning(f"Batch {batch_id} completed without output")
+            return results
+        
+        output = self.client.files.content(batch.output_file_id).text
+        for line in output.splitlines():
+            if not line.strip():
+                continue
+            record = json_utils.loads(line)
+            response = record.get("response") or {}
+            if record.get("error") or response.get("status_code") != 200:
+                self.logger.warning(f"Batch request {record.get('custom_id')} failed: {record.get('error')}")
+                continue
+            results[record["custom_id"]] = response["body"]["choices"][0]["message"]["content"]
+        
+        self.logger.info(f"Batch {batch_id} completed with {len(results)} responses")
+        return results
+    
+    def _analysis_and_improvement_messages(
+        self,
+        simulation_results: Dict[str, Any],
+        design: Dict[str, Any],
+        product_specs: Dict[str, Any],
+        iteration: int,
+        max_iterations: int,
+        feedback: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, str]]:
+        """Build the chat messages for a combined analysis and improvement request."""
+        # Only the volatile data goes into the user message; the instructions
+        # live in the byte-stable system prefix
+        sections = [
+            _ANALYSIS_AND_IMPROVEMENT_HEADER_TMPL.format(iteration=iteration, max_iterations=max_iterations),
+            _DESIGN_HEADER,
+            json_utils.dumps(design)
+        ]
+        if simulation_results:
+            simulation_results = _project(simulation_results, _SIM_RESULT_WHITELIST)
+            refs, simulation_results = _reference_repeats(simulation_results)
+            sections += [_SIMULATION_RESULTS_HEADER, json_utils.dumps(simulation_results)]
+            if refs:
+                sections += [_REFS_HEADER, json_utils.dumps(refs)]
+        if product_specs:
+            sections += [_PRODUCT_SPECS_HEADER, json_utils.dumps(product_specs)]
+        if feedback:
+            sections += [_FEEDBACK_HEADER, json_utils.dumps(feedback)]
+        sections.append("\n")
+        context = "".join(sections)
+        return [
+            {"role": "system", "content": self._analysis_and_improvement_system_message},
+            {"role": "user", "content": context}
+        ]
+    
+    def _remember_analysis_and_improvements(self, memo_key: Tuple[str, ...], result: str) -> Dict[str, Any]:
+        """
+        Parse a combined analysis and improvement response and remember it.
+        
+        Args:
+            memo_key: Memo key of the request
+            result: Raw content returned by the model
+            
+        Returns:
+            Dict: Analysis under "analysis" and suggested improvements under "improvements"
+        """
+        combined = self._parse_json_response(result, "assessment")
+        combined = {
+            "analysis": combined.get("analysis", combined),
+            "improvements": combined.get("improvements", {})
+        }
+        self._memo_put(memo_key, combined)
+        return combined
+    
     def analyze_simulation_results(
         self, 
         simulation_results: Dict[str, Any],
@@ -99,6 +995,8 @@ class OpenAIModelManager:
         """
         Analyze simulation results and provide feedback for improvement.
         
+        Deprecated: use analyze_and_suggest, which this wraps.
+        
         Args:
             simulation_results: Dictionary containing simulation results
             design: The current process design
@@ -107,80 +1005,309 @@ class OpenAIModelManager:
         Returns:
             Dict: Analysis and recommendations
         """
-        self.logger.info("Analyzing simulation results using OpenAI model")
+        warnings.warn(
+            "analyze_simulation_results is deprecated, use analyze_and_suggest",
+            DeprecationWarning,
+            stacklevel=2
+        )
+        combined = self.analyze_and_suggest(simulation_results, design, product_specs, 1, 1)
+        return combined.get("analysis", combined)
+    
+    def suggest_design_improvements(
+        self,
+        current_design: Dict[str, Any],
+        feedback: Dict[str, Any],
+        iteration: int,
+        max_iterations: int
+    ) -> Dict[str, Any]:
+        """
+        Suggest specific improvements to the process design based on feedback.
         
-        # Format the context for analysis
-        context = f"""
-# Chemical Process Simulation Analysis
-
-## Current Process Design
-{json.dumps(design, indent=2)}
+        Deprecated: use analyze_and_suggest, which this wraps.
+        
+        Args:
+            current_design: The current process design
+            feedback: Feedback from the previous iteration
+            iteration: Current iteration number
+            max_iterations: Maximum number of iterations
+            
+        Returns:
+            Dict: Suggested improvements
+        """
+        warnings.warn(
+            "suggest_design_improvements is deprecated, use analyze_and_suggest",
+            DeprecationWarning,
+            stacklevel=2
+        )
+        combined = self.analyze_and_suggest({}, current_design, {}, iteration, max_iterations, feedback=feedback)
+        return combined.get("improvements", combined)
+    
+    def analyze_and_suggest(
+        self,
+        simulation_results: Dict[str, Any],
+        design: Dict[str, Any],
+        product_specs: Dict[str, Any],
+        iteration: int,
+        max_iterations: int,
+        feedback: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        Analyze simulation results and suggest design improvements in a single model call.
+        
+        Args:
+            simulation_results: Dictionary containing simulation results (may be empty)
+            design: The current process design
+            product_specs: Product specifications (may be empty)
+            iteration: Current iteration number
+            max_iterations: Maximum number of iterations
+            feedback: Feedback from the previous iteration (optional)
+            
+        Returns:
+            Dict: Analysis under "analysis" and suggested improvements under "improvements"
+        """
+        self.logger.info(f"Analyzing simulation results and suggesting improvements for iteration {iteration}/{max_iterations}")
+        
+        try:
+            memo_key = _analysis_and_improvement_key(
+                simulation_results, design, product_specs, iteration, max_iterations, feedback
+            )
+            memoized = self._memo_get(memo_key)
+            if memoized is not None:
+                return memoized
+            
+            messages = self._analysis_and_improvement_messages(
+                simulation_results, design, product_specs, iteration, max_iterations, feedback
+            )
+            result = self._cached_create(messages, method="analysis_and_improvement")
+            return self._remember_analysis_and_improvements(memo_key, result)
+                
+        except Exception as e:
+            self.logger.error(f"Error analyzing simulation results and suggesting improvements: {e}")
+            return {"error": str(e)}
 
-## Simulation Results
-{json.dumps(simulation_results, indent=2)}
 
-## Product Specifications
-{json.dumps(product_specs, indent=2)}
+class TokenBucket:
+    """
+    Proactive client-side throttle for the OpenAI request and token rate limits.
+    
+    Capacity refills continuously; callers wait until enough capacity is
+    available instead of sending requests that would be rejected with HTTP 429.
+    """
+    
+    def __init__(self, requests_per_min: float, tokens_per_min: float):
+        """
+        Initialize the token bucket.
+        
+        Args:
+            requests_per_min: Maximum number of requests per minute
+            tokens_per_min: Maximum number of tokens per minute
+        """
+        self.requests_per_min = requests_per_min
+        self.tokens_per_min = tokens_per_min
+        self._available_requests = float(requests_per_min)
+        self._available_tokens = float(tokens_per_min)
+        self._last_update = time.monotonic()
+        self._lock = asyncio.Lock()
+    
+    def _refill(self) -> None:
+        """Add the capacity accumulated since the last update."""
+        now = time.monotonic()
+        elapsed = now - self._last_update
+        self._last_update = now
+        self._available_requests = min(
+            self.requests_per_min,
+            self._available_requests + elapsed * self.requests_per_min / 60.0
+        )
+        self._available_tokens = min(
+            self.tokens_per_min,
+            self._available_tokens + elapsed * self.tokens_per_min / 60.0
+        )
+    
+    async def acquire(self, estimated_tokens: int) -> None:
+        """
+        Wait until capacity for one request of the given size is available and consume it.
+        
+        Args:
+            estimated_tokens: Estimated number of tokens the request will consume
+        """
+        # A request larger than the bucket could otherwise never be admitted
+        estimated_tokens = min(estimated_tokens, self.tokens_per_min)
+        
+        # Holding the lock while sleeping keeps waiting requests in FIFO order
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._available_requests >= 1 and self._available_tokens >= estimated_tokens:
+                    self._available_requests -= 1
+                    self._available_tokens -= estimated_tokens
+                    return
+                
+                wait = max(
+                    (1 - self._available_requests) * 60.0 / self.requests_per_min,
+                    (estimated_tokens - self._available_tokens) * 60.0 / self.tokens_per_min
+                )
+                await asyncio.sleep(wait)
 
-Please analyze the simulation results and provide:
-1. An assessment of how well the process meets product specifications
-2. Identification of any constraint violations or inefficiencies
-3. Specific recommendations for improving the process design
-4. A priority ranking of the issues that need to be addressed
 
-Format your response as a JSON with the following structure:
-```json
-{{
-  "assessment": "Overall assessment of the process performance",
-  "issues": [
-    {{
-      "description": "Issue description",
-      "severity": "high/medium/low",
-      "related_to": "unit-id or stream-id or general"
-    }}
-  ],
-  "recommendations": [
-    {{
-      "description": "Recommendation description",
-      "target": "unit-id or stream-id or general",
-      "expected_impact": "Description of expected improvement"
-    }}
-  ],
-  "priority_actions": ["First action", "Second action", ...]
-}}
-```
-"""
+class AsyncOpenAIModelManager(OpenAIModelManager):
+    """
+    Asynchronous variant of OpenAIModelManager.
+    
+    Requests are sent with AsyncOpenAI and throttled by a TokenBucket, so that
+    many designs can be processed concurrently with asyncio.gather up to the
+    account's rate limits. Batch API helpers are inherited unchanged, and
+    only the awaited transport is overridden; caching, completion budgets,
+    memoization and parsing go through the helpers of the base class.
+    """
+    
+    def __init__(
+        self,
+        model: str,
+        api_key: str,
+        organization: str = "",
+        temperature: float = 0.2,
+        system_message: str = "",
+        cache_enabled: bool = False,
+        cache_ttl: float = 3600.0,
+        cache: Optional[PersistentLLMCache] = None,
+        requests_per_min: float = 500,
+        tokens_per_min: float = 30000
+    ):
+        """
+        Initialize the asynchronous OpenAI model manager.
+        
+        Args:
+            model: The OpenAI model to use (e.g., "gpt-4o")
+            api_key: OpenAI API key
+            organization: OpenAI organization ID (optional)
+            temperature: Model temperature (0.0 to 1.0)
+            system_message: System message to guide the model's responses
+            cache_enabled: Reuse responses for identical requests (only when temperature is 0)
+            cache_ttl: Maximum age of a cached response in seconds
+            cache: Persistent cache shared across runs (optional, requires cache_enabled)
+            requests_per_min: Request rate limit to stay under
+            tokens_per_min: Token rate limit to stay under
+        """
+        super().__init__(
+            model=model,
+            api_key=api_key,
+            organization=organization,
+            temperature=temperature,
+            system_message=system_message,
+            cache_enabled=cache_enabled,
+            cache_ttl=cache_ttl,
+            cache=cache
+        )
         
         try:
-            messages = [
-                {"role": "system", "content": self.system_message},
-                {"role": "user", "content": context}
-            ]
-            
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=messages,
-                temperature=self.temperature,
-                response_format={"type": "json_object"},
-                max_tokens=2000
-            )
+            self.aclient = _get_client(api_key, organization, asynchronous=True)
+        except Exception as e:
+            self.logger.error(f"Error initializing async OpenAI client: {e}")
+            raise
+        
+        # Shared with every other manager using the same account, so concurrent
+        # agents stay under the limits together rather than each on its own
+        self.bucket = _get_bucket(api_key, organization, requests_per_min, tokens_per_min)
+    
+    @async_retry(max_attempts=3, base_delay=2.0, max_delay=30.0, retry_if=_is_transient_error)
+    async def _cached_create(self, messages: List[Dict[str, str]], max_tokens: Optional[int] = None, method: str = "") -> str:
+        """
+        Request a JSON chat completion, reusing the cached content of identical requests.
+        
+        Args:
+            messages: Chat messages sent to the model
+            max_tokens: Maximum number of tokens to generate (predicted from recent responses when None)
+            method: Name of the calling method, recorded with persisted responses
+            
+        Returns:
+            str: Content of the model response
+        """
+        key, content, max_tokens = self._prepare_create(messages, max_tokens, method)
+        if content is not None:
+            return content
+        
+        # The static system prefix is counted exactly (once); the volatile
+        # messages at roughly 4 characters per token. The limiter also counts max_tokens
+        estimated_tokens = self._prefix_tokens(messages[0]["content"])
+        estimated_tokens += sum(len(m["content"]) for m in messages[1:]) // 4 + max_tokens
+        await self.bucket.acquire(estimated_tokens)
+        
+        stream = await self.aclient.chat.completions.create(**self._request_body(messages, max_tokens), stream=True)
+        content = await self._consume_stream(stream)
+        if self._is_truncated(content, max_tokens):
+            await self.bucket.acquire(estimated_tokens - max_tokens + _MAX_OUTPUT_TOKENS)
+            stream = await self.aclient.chat.completions.create(**self._request_body(messages, _MAX_OUTPUT_TOKENS), stream=True)
+            content = await self._consume_stream(stream)
+        
+        return self._finish_create(key, content, method)
+    
+    async def _consume_stream(self, stream) -> str:
+        """
+        Read a streamed JSON response, stopping as soon as the top-level object is complete.
+        
+        Args:
+            stream: Streaming chat completion response
             
-            # Extract and parse the response
-            result = response.choices[0].message.content
+        Returns:
+            str: Content of the model response
+        """
+        collector = _StreamCollector()
+        try:
+            async for chunk in stream:
+                if collector.add(chunk):
+                    break
+        finally:
+            await stream.close()
+        return collector.content
+    
+    async def generate_process_design(self, context: str) -> Dict[str, Any]:
+        """
+        Generate a process design based on the provided context.
+        
+        Args:
+            context: String containing raw materials, product specifications, and requirements
             
-            try:
-                # Try to parse as JSON
-                analysis = json.loads(result)
-                return analysis
-            except json.JSONDecodeError:
-                self.logger.warning("Failed to parse analysis response as JSON, returning raw response")
-                return {"assessment": result}
+        Returns:
+            Dict: Process design as a structured dictionary
+        """
+        self.logger.info(f"Generating process design using {self.model}")
+        
+        try:
+            result = await self._cached_create(self._design_messages(context), method="design")
+            return self.parse_process_design(result)
                 
         except Exception as e:
-            self.logger.error(f"Error analyzing simulation results: {e}")
+            self.logger.error(f"Error generating process design: {e}")
             return {"error": str(e)}
     
-    def suggest_design_improvements(
+    async def analyze_simulation_results(
+        self, 
+        simulation_results: Dict[str, Any],
+        design: Dict[str, Any],
+        product_specs: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        Analyze simulation results and provide feedback for improvement.
+        
+        Deprecated: use analyze_and_suggest, which this wraps.
+        
+        Args:
+            simulation_results: Dictionary containing simulation results
+            design: The current process design
+            product_specs: Product specifications
+            
+        Returns:
+            Dict: Analysis and recommendations
+        """
+        warnings.warn(
+            "analyze_simulation_results is deprecated, use analyze_and_suggest",
+            DeprecationWarning,
+            stacklevel=2
+        )
+        combined = await self.analyze_and_suggest(simulation_results, design, product_specs, 1, 1)
+        return combined.get("analysis", combined)
+    
+    async def suggest_design_improvements(
         self,
         current_design: Dict[str, Any],
         feedback: Dict[str, Any],
@@ -190,6 +1317,8 @@ Format your response as a JSON with the following structure:
         """
         Suggest specific improvements to the process design based on feedback.
         
+        Deprecated: use analyze_and_suggest, which this wraps.
+        
         Args:
             current_design: The current process design
             feedback: Feedback from the previous iteration
@@ -199,85 +1328,53 @@ Format your response as a JSON with the following structure:
         Returns:
             Dict: Suggested improvements
         """
-        self.logger.info(f"Suggesting design improvements for iteration {iteration}/{max_iterations}")
+        warnings.warn(
+            "suggest_design_improvements is deprecated, use analyze_and_suggest",
+            DeprecationWarning,
+            stacklevel=2
+        )
+        combined = await self.analyze_and_suggest({}, current_design, {}, iteration, max_iterations, feedback=feedback)
+        return combined.get("improvements", combined)
+    
+    async def analyze_and_suggest(
+        self,
+        simulation_results: Dict[str, Any],
+        design: Dict[str, Any],
+        product_specs: Dict[str, Any],
+        iteration: int,
+        max_iterations: int,
+        feedback: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        Analyze simulation results and suggest design improvements in a single model call.
         
-        # Format the context for improvement suggestions
-        context = f"""
-# Process Design Improvement (Iteration {iteration}/{max_iterations})
-
-## Current Process Design
-{json.dumps(current_design, indent=2)}
-
-## Feedback from Previous Simulation
-{json.dumps(feedback, indent=2)}
-
-Based on the feedback from the previous simulation, please suggest specific improvements to the process design.
-Focus on addressing the most critical issues first.
-
-Your response should include:
-1. A summary of the key issues that need to be addressed
-2. Specific changes to unit operations (parameters, configurations)
-3. Specific changes to process streams (flow rates, compositions)
-4. Rationale for each suggested change
-
-Format your response as a JSON with the following structure:
-```json
-{{
-  "summary": "Summary of key issues and approach to improvements",
-  "unit_operation_changes": [
-    {{
-      "unit_id": "unit-id",
-      "parameter": "parameter name",
-      "current_value": current value,
-      "suggested_value": suggested value,
-      "rationale": "Reason for the change"
-    }}
-  ],
-  "stream_changes": [
-    {{
-      "stream_id": "stream-id",
-      "parameter": "parameter name",
-      "current_value": current value,
-      "suggested_value": suggested value,
-      "rationale": "Reason for the change"
-    }}
-  ],
-  "structural_changes": [
-    {{
-      "type": "add/remove/modify",
-      "description": "Description of the structural change",
-      "rationale": "Reason for the change"
-    }}
-  ]
-}}
-```
-"""
+        Args:
+            simulation_results: Dictionary containing simulation results (may be empty)
+            design: The current process design
+            product_specs: Product specifications (may be empty)
+            iteration: Current iteration number
+            max_iterations: Maximum number of iterations
+            feedback: Feedback from the previous iteration (optional)
+            
+        Returns:
+            Dict: Analysis under "analysis" and suggested improvements under "improvements"
+        """
+        self.logger.info(f"Analyzing simulation results and suggesting improvements for iteration {iteration}/{max_iterations}")
         
         try:
-            messages = [
-                {"role": "system", "content": self.system_message},
-                {"role": "user", "content": context}
-            ]
-            
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=messages,
-                temperature=self.temperature,
-                response_format={"type": "json_object"},
-                max_tokens=2000
+            memo_key = _analysis_and_improvement_key(
+                simulation_results, design, product_specs, iteration, max_iterations, feedback
             )
+            memoized = self._memo_get(memo_key)
+            if memoized is not None:
+                return memoized
             
-            # Extract and parse the response
-            result = response.choices[0].message.content
-            
-            try:
-                # Try to parse as JSON
-                improvements = json.loads(result)
-                return improvements
-            except json.JSONDecodeError:
-                self.logger.warning("Failed to parse improvements response as JSON, returning raw response")
-                return {"summary": result}
+            messages = self._analysis_and_improvement_messages(
+                simulation_results, design, product_specs, iteration, max_iterations, feedback
+            )
+            result = await self._cached_create(messages, method="analysis_and_improvement")
+            return self._remember_analysis_and_improvements(memo_key, result)
                 
         except Exception as e:
-            self.logger.error(f"Error suggesting design improvements: {e}")
-            return {"error": str(e)}
\ No newline at end of file
+            self.logger.error(f"Error analyzing simulation results and suggesting improvements: {e}")
+            return {"error": str(e)}
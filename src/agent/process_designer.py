@@ -5,23 +5,152 @@ This module contains the main agent class that designs chemical processes
 using OpenAI's API and iteratively improves them based on simulation results.
 """
 
+import asyncio
 import os
 import json
 import logging
+import re
+from dataclasses import asdict, dataclass, field
 from datetime import datetime
-from typing import Dict, List, Any, Optional, Tuple
+from string import Template
+from typing import Dict, List, Any, Optional, Tuple, Union
 
-from src.agent.model_manager import OpenAIModelManager
+from src.agent.llm_cache import PersistentLLMCache
+from src.agent.model_manager import AsyncOpenAIModelManager
 from src.dwsim.simulator import DWSIMSimulator
 from src.dwsim.model_converter import ModelConverter
 from src.evaluation.constraint_checker import ConstraintChecker
 from src.evaluation.results_analyzer import ResultsAnalyzer
+from src.utils import json_utils
 from src.utils.logger import get_logger
 
+# Improvement suggestion for each type of product specification issue
+_ISSUE_SUGGESTIONS = {
+    "purity": "Improve separation for {product} to increase purity",
+    "yield": "Adjust reaction conditions or improve recovery for {product}",
+    "production_rate": "Increase feed rate or improve conversion for {product}",
+    "temperature": "Adjust cooling/heating for {product} stream",
+    "pressure": "Adjust pressure control for {product} stream"
+}
+
+# Design prompt. Everything before the iteration information is invariant
+# within a run (see _build_context_template), so it forms a byte-stable
+# prefix for the provider's automatic prompt caching.
+_DESIGN_CONTEXT_TEMPLATE = Template("""
+# Chemical Process Design Task
+
+## Raw Materials
+$raw_materials
+
+## Product Specifications
+$product_specs
+
+## Process Design Requirements
+1. Design a complete chemical process that converts the given raw materials into the specified products.
+2. The process should satisfy all product specifications including purity, yield, and production rate.
+3. The process must satisfy mass and energy balance constraints.
+4. All unit operations must be fully specified with appropriate parameters.
+5. Include material and energy streams between unit operations.
+6. Specify operating conditions (temperature, pressure) for each unit.
+7. Use $property_package as the thermodynamic property package for this design.
+
+## Output Format
+Please provide your process design in JSON format with the following structure:
+```json
+{
+  "process_name": "Name of the process",
+  "description": "Brief description of the process",
+  "property_package": "$property_package",
+  "unit_operations": [
+    {
+      "id": "unit-1",
+      "name": "Descriptive name",
+      "type": "reactor/distillation/heat-exchanger/etc.",
+      "specifications": {
+        // Unit-specific parameters
+      },
+      "operating_conditions": {
+        "temperature": value,
+        "temperature_unit": "C/K/F",
+        "pressure": value,
+        "pressure_unit": "kPa/bar/psi",
+        "additional_parameters": {}
+      }
+    }
+  ],
+  "streams": [
+    {
+      "id": "stream-1",
+      "name": "Descriptive name",
+      "type": "feed/intermediate/product/utility",
+      "source": "unit-id or 'feed'",
+      "destination": "unit-id or 'product'",
+      "specifications": {
+        "phase": "liquid/gas/mixed",
+        "temperature": value,
+        "temperature_unit": "C/K/F",
+        "pressure": value,
+        "pressure_unit": "kPa/bar/psi",
+        "flow_rate": value,
+        "flow_rate_unit": "kmol/h or kg/h",
+        "composition": [
+          {
+            "component": "component name or formula",
+            "fraction": value,
+            "fraction_type": "mole/mass"
+          }
+        ]
+      }
+    }
+  ],
+  "rationale": "Explanation of design choices and expected performance"
+}
+```
+
+Please provide your detailed process design now.
+
+## Iteration Information
+This is iteration $iteration of a maximum $max_iterations iterations.
+""")
+
+# Fenced JSON block in a free-text model response
+_JSON_FENCE_RE = re.compile(r"```json\s*(.*?)\s*```", re.DOTALL)
+
+def _write_json(path: str, data: Any) -> None:
+    """Write data to a JSON file."""
+    json_utils.dump_file(data, path, indent=True)
+
+def _write_json_once(path: str, data: Any) -> None:
+    """Write data to a large JSON file that is not read back during the run."""
+    json_utils.dump_file(data, path, indent=True, drop_cache=True)
+
+def _append_json_line(path: str, data: Any) -> None:
+    """Append data to a JSON Lines file as a single line."""
+    with open(path, "ab") as f:
+        f.write(json_utils.dumpb(data) + b"\n")
+
+def _write_text(path: str, text: str) -> None:
+    """Write text to a file."""
+    with open(path, "w") as f:
+        f.write(text)
+
+@dataclass(slots=True)
+class IterationMetrics:
+    """Numeric results of one design iteration, kept for plotting and reporting."""
+    iteration: int
+    score: Optional[float] = None
+    mass_balance_error: Optional[float] = None
+    energy_balance_error: Optional[float] = None
+    product_scores: Dict[str, float] = field(default_factory=dict)
+
 class ProcessDesignerAgent:
     """
     Agent that designs chemical processes using OpenAI's models and simulates them with DWSIM.
     """
+    
+    # matplotlib.pyplot and numpy, imported on first use by _plotting_modules
+    _plt = None
+    _np = None
 
     def __init__(
         self,
@@ -49,15 +178,30 @@ class ProcessDesignerAgent:
         self.base_output_dir = output_dir
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         self.output_dir = os.path.join(output_dir, f"run_{timestamp}")
-        os.makedirs(self.output_dir, exist_ok=True)
+        self._created_dirs = set()
+        self._ensure_dir(self.output_dir)
+        self._history_path = os.path.join(self.output_dir, "iteration_history.jsonl")
         
         # Initialize components
-        self.model_manager = OpenAIModelManager(
+        cache_config = config.get("cache", {})
+        persistent_cache = None
+        if cache_config.get("enabled", False) and cache_config.get("sqlite_path"):
+            persistent_cache = PersistentLLMCache(
+                cache_config["sqlite_path"],
+                ttl=cache_config.get("ttl", 3600)
+            )
+        
+        self.model_manager = AsyncOpenAIModelManager(
             model=config["agent"]["model"],
             api_key=config["openai"]["api_key"],
             organization=config["openai"].get("organization", ""),
             temperature=config["agent"]["temperature"],
-            system_message=config["agent"]["system_message"]
+            system_message=config["agent"]["system_message"],
+            cache_enabled=cache_config.get("enabled", False),
+            cache_ttl=cache_config.get("ttl", 3600),
+            cache=persistent_cache,
+            requests_per_min=config["openai"].get("requests_per_minute", 500),
+            tokens_per_min=config["openai"].get("tokens_per_minute", 30000)
         )
         
         self.simulator = DWSIMSimulator(
@@ -80,36 +224,92 @@ class ProcessDesignerAgent:
             yield_tolerance=config["evaluation"]["yield_tolerance"]
         )
         
+        # Balance errors (in %) beyond which a design is rejected without
+        # examining its products: 10x the configured (fractional) tolerances
+        self._mass_error_cutoff = 10 * 100 * config["evaluation"]["mass_balance_tolerance"]
+        self._energy_error_cutoff = 10 * 100 * config["evaluation"]["energy_balance_tolerance"]
+        
+        # Candidate designs requested concurrently per iteration; the best
+        # scoring one is carried forward
+        self.candidates_per_iteration = max(1, config["agent"].get("candidates_per_iteration", 1))
+        self._request_semaphore = asyncio.Semaphore(config["agent"].get("max_concurrent_requests", 4))
+        self._simulation_semaphore = asyncio.Semaphore(
+            config["dwsim"].get("max_parallel_simulations") or os.cpu_count() or 1
+        )
+        
         # Track iterations and best design
         self.current_iteration = 0
         self.max_iterations = config["agent"]["max_iterations"]
         self.best_design = None
         self.best_score = -float('inf')
         self.history = []
+        self.metrics: List[IterationMetrics] = []
+        
+        # Output files written in worker threads; each iteration's writes overlap
+        # the next design request and are awaited after it
+        self._pending_writes: List[asyncio.Task] = []
+        
+        # Config as saved with the run, without the (long) system message
+        self._serializable_config = {
+            k: ({kk: vv for kk, vv in v.items() if kk != "system_message"} if k == "agent" else v)
+            for k, v in config.items()
+        }
+        
+        # The design context only changes in its trailing iteration section
+        self._build_context_template()
         
         # Save initial input data
         self._save_input_data()
         
+    def _ensure_dir(self, path: str) -> str:
+        """
+        Create a directory unless this agent already created it.
+        
+        Args:
+            path: Directory to create
+            
+        Returns:
+            str: The directory path
+        """
+        if path not in self._created_dirs:
+            os.makedirs(path, exist_ok=True)
+            self._created_dirs.add(path)
+        return path
+    
     def _save_input_data(self):
         """Save the input data used for this run."""
-        with open(os.path.join(self.output_dir, "raw_materials.json"), "w") as f:
-            json.dump(self.raw_materials, f, indent=2)
-            
-        with open(os.path.join(self.output_dir, "product_specs.json"), "w") as f:
-            json.dump(self.product_specs, f, indent=2)
-            
-        with open(os.path.join(self.output_dir, "config.json"), "w") as f:
-            # Convert the config to a JSON-serializable format
-            serializable_config = {k: v for k, v in self.config.items() if k != "agent" or k != "system_message"}
-            if "agent" in serializable_config:
-                serializable_config["agent"] = {k: v for k, v in serializable_config["agent"].items() 
-                                              if k != "system_message"}
-            json.dump(serializable_config, f, indent=2)
+        _write_json(os.path.join(self.output_dir, "raw_materials.json"), self.raw_materials)
+        _write_json(os.path.join(self.output_dir, "product_specs.json"), self.product_specs)
+        _write_json(os.path.join(self.output_dir, "config.json"), self._serializable_config)
+    
+    def _schedule_write(self, write, path: str, data: Any) -> None:
+        """
+        Write an output file in a worker thread so disk I/O overlaps with the next request.
+        
+        Args:
+            write: Blocking write function taking (path, data)
+            path: Path of the file to write
+            data: Content to write (must not be mutated until the write completes)
+        """
+        self._pending_writes.append(asyncio.create_task(asyncio.to_thread(write, path, data)))
+    
+    async def _flush_writes(self) -> None:
+        """Wait for all scheduled output file writes to complete."""
+        if not self._pending_writes:
+            return
+        pending, self._pending_writes = self._pending_writes, []
+        for result in await asyncio.gather(*pending, return_exceptions=True):
+            if isinstance(result, Exception):
+                self.logger.error(f"Error writing output file: {result}")
     
-    def run(self) -> bool:
+    async def run(self, initial_design: Optional[Dict[str, Any]] = None) -> bool:
         """
         Run the process design agent through the full design-simulation-feedback loop.
         
+        Args:
+            initial_design: Design for the first iteration obtained ahead of time
+                (e.g. through the Batch API); requested from the model if not given
+        
         Returns:
             bool: True if a successful design was found, False otherwise
         """
@@ -121,116 +321,272 @@ class ProcessDesignerAgent:
             self.logger.info(f"Beginning iteration {self.current_iteration}/{self.max_iterations}")
             
             # Create iteration directory
-            iteration_dir = os.path.join(self.output_dir, f"iteration_{self.current_iteration}")
-            os.makedirs(iteration_dir, exist_ok=True)
-            
-            # Get process design from OpenAI agent
-            process_design = self._generate_process_design()
-            
-            # Save the process design
-            design_path = os.path.join(iteration_dir, "process_design.json")
-            with open(design_path, "w") as f:
-                json.dump(process_design, f, indent=2)
-            
-            # Convert design to DWSIM model
-            try:
-                dwsim_model = self.model_converter.convert_design_to_dwsim(process_design)
-                model_path = os.path.join(iteration_dir, "dwsim_model.dwxml")
-                self.model_converter.save_model(dwsim_model, model_path)
-                self.logger.info(f"Saved DWSIM model to {model_path}")
-            except Exception as e:
-                self.logger.error(f"Error converting design to DWSIM model: {e}")
-                feedback = {
-                    "status": "error",
-                    "message": f"Failed to convert design to DWSIM model: {str(e)}",
-                    "suggestions": ["Ensure all units and connections are properly specified",
-                                  "Check for invalid operation parameters"]
-                }
-                self._record_iteration_results(iteration_dir, process_design, None, feedback)
-                continue
-            
-            # Run simulation
-            try:
-                simulation_results = self.simulator.run_simulation(model_path)
-                results_path = os.path.join(iteration_dir, "simulation_results.json")
-                with open(results_path, "w") as f:
-                    json.dump(simulation_results, f, indent=2)
-                self.logger.info(f"Saved simulation results to {results_path}")
-            except Exception as e:
-                self.logger.error(f"Error running simulation: {e}")
-                feedback = {
-                    "status": "error",
-                    "message": f"Simulation failed: {str(e)}",
-                    "suggestions": ["Check for invalid input parameters",
-                                  "Ensure thermodynamic property package is appropriate for components"]
-                }
-                self._record_iteration_results(iteration_dir, process_design, None, feedback)
-                continue
-            
-            # Evaluate results
-            constraint_results = self.constraint_checker.check_constraints(simulation_results)
-            product_evaluation = self.results_analyzer.analyze_results(simulation_results)
-            
-            # Combine evaluation results
-            evaluation = {
-                "constraint_check": constraint_results,
-                "product_evaluation": product_evaluation
-            }
+            iteration_dir = self._ensure_dir(os.path.join(self.output_dir, f"iteration_{self.current_iteration}"))
             
-            evaluation_path = os.path.join(iteration_dir, "evaluation.json")
-            with open(evaluation_path, "w") as f:
-                json.dump(evaluation, f, indent=2)
-            self.logger.info(f"Saved evaluation to {evaluation_path}")
-            
-            # Generate feedback
-            feedback = self._generate_feedback(constraint_results, product_evaluation)
+            # Get candidate process designs from OpenAI agent
+            if self.current_iteration == 1 and initial_design is not None:
+                process_designs = [await self._generate_process_design(initial_design)]
+            else:
+                process_designs = await self._generate_candidate_designs(self.candidates_per_iteration)
+            
+            # The previous iteration's output files were written while the
+            # designs were being generated
+            await self._flush_writes()
+            
+            # Simulate the candidates concurrently and keep the best scoring one
+            candidate_dirs = [iteration_dir]
+            if len(process_designs) > 1:
+                candidate_dirs = [
+                    os.path.join(iteration_dir, f"candidate_{index}")
+                    for index in range(1, len(process_designs) + 1)
+                ]
+                for candidate_dir in candidate_dirs:
+                    self._ensure_dir(candidate_dir)
+            candidates = await asyncio.gather(*[
+                self._evaluate_candidate(candidate_dir, process_design)
+                for candidate_dir, process_design in zip(candidate_dirs, process_designs)
+            ])
+            
+            best_candidate = max(candidates, key=lambda candidate: candidate["score"])
+            if len(candidates) > 1:
+                self.logger.info(f"Selected {os.path.basename(best_candidate['dir'])} of {len(candidates)} candidates")
+            
+            process_design = best_candidate["process_design"]
+            simulation_results = best_candidate["simulation_results"]
+            feedback = best_candidate["feedback"]
             
             # Check if this is the best design so far
-            current_score = self._calculate_design_score(constraint_results, product_evaluation)
+            current_score = best_candidate["score"]
             if current_score > self.best_score:
                 self.best_score = current_score
                 self.best_design = {
                     "iteration": self.current_iteration,
                     "process_design": process_design,
                     "simulation_results": simulation_results,
-                    "evaluation": evaluation,
+                    "evaluation": best_candidate["evaluation"],
                     "score": current_score
                 }
                 self.logger.info(f"New best design found at iteration {self.current_iteration} with score {current_score:.4f}")
             
             # Record this iteration
-            self._record_iteration_results(iteration_dir, process_design, simulation_results, feedback)
+            self._record_iteration_results(
+                iteration_dir, process_design, simulation_results, feedback, best_candidate["dir"],
+                evaluation=best_candidate["evaluation"], score=current_score
+            )
             
             # Check if design meets all requirements
             if feedback["status"] == "success":
                 self.logger.info("Process design meets all requirements!")
+                await self._flush_writes()
                 self._generate_final_report()
                 return True
         
         # If we've reached here, we've hit the maximum iterations without finding a perfect solution
         self.logger.info(f"Reached maximum iterations ({self.max_iterations}) without finding a perfect solution")
         self.logger.info(f"Best design found at iteration {self.best_design['iteration']} with score {self.best_score:.4f}")
+        await self._flush_writes()
         self._generate_final_report()
         return False
     
-    def _generate_process_design(self) -> Dict[str, Any]:
+    async def _evaluate_candidate(self, candidate_dir: str, process_design: Dict[str, Any]) -> Dict[str, Any]:
         """
-        Generate a process design using the OpenAI agent.
+        Convert, simulate and evaluate a candidate process design.
         
+        Args:
+            candidate_dir: Directory to save the candidate's outputs
+            process_design: Candidate process design
+            
         Returns:
-            Dict: A dictionary containing the process design
+            Dict: The design, its simulation results, evaluation, feedback and score
+                (score is -inf if the candidate could not be simulated)
+        """
+        candidate = {
+            "dir": candidate_dir,
+            "process_design": process_design,
+            "simulation_results": None,
+            "evaluation": None,
+            "feedback": None,
+            "score": -float('inf')
+        }
+        
+        # Save the process design
+        design_path = os.path.join(candidate_dir, "process_design.json")
+        self._schedule_write(_write_json, design_path, process_design)
+        
+        # Convert design to DWSIM model
+        try:
+            model_path = os.path.join(candidate_dir, "dwsim_model.dwxml")
+            self.model_converter.save_model(process_design, model_path)
+            self.logger.info(f"Saved DWSIM model to {model_path}")
+        except Exception as e:
+            self.logger.error(f"Error converting design to DWSIM model: {e}")
+            candidate["feedback"] = {
+                "status": "error",
+                "message": f"Failed to convert design to DWSIM model: {str(e)}",
+                "suggestions": ["Ensure all units and connections are properly specified",
+                              "Check for invalid operation parameters"]
+            }
+            return candidate
+        
+        # Run simulation
+        try:
+            # Run the blocking simulator in a worker thread so other candidates and
+            # agents keep progressing; each run is a separate DWSIM process
+            async with self._simulation_semaphore:
+                simulation_results = await asyncio.to_thread(self.simulator.run_simulation, model_path)
+            results_path = os.path.join(candidate_dir, "simulation_results.json")
+            self._schedule_write(_write_json_once, results_path, simulation_results)
+            self.logger.info(f"Saving simulation results to {results_path}")
+        except Exception as e:
+            self.logger.error(f"Error running simulation: {e}")
+            candidate["feedback"] = {
+                "status": "error",
+                "message": f"Simulation failed: {str(e)}",
+                "suggestions": ["Check for invalid input parameters",
+                              "Ensure thermodynamic property package is appropriate for components"]
+            }
+            return candidate
+        
+        # Evaluate results
+        constraint_results = self.constraint_checker.check_constraints(simulation_results)
+        product_evaluation = self.results_analyzer.analyze_results(simulation_results)
+        
+        # Combine evaluation results
+        evaluation = {
+            "constraint_check": constraint_results,
+            "product_evaluation": product_evaluation
+        }
+        
+        evaluation_path = os.path.join(candidate_dir, "evaluation.json")
+        self._schedule_write(_write_json_once, evaluation_path, evaluation)
+        self.logger.info(f"Saving evaluation to {evaluation_path}")
+        
+        candidate["simulation_results"] = simulation_results
+        candidate["evaluation"] = evaluation
+        candidate["feedback"] = self._generate_feedback(constraint_results, product_evaluation)
+        candidate["score"] = self._calculate_design_score(constraint_results, product_evaluation)
+        return candidate
+    
+    def build_design_request(self) -> Dict[str, Any]:
+        """
+        Build the model request for the next design without sending it.
+        
+        Returns:
+            Dict: Chat completion request body, e.g. for submission in a batch
+        """
+        current_iteration = self.current_iteration
+        self.current_iteration += 1
+        try:
+            context = self._build_design_prompt()
+        finally:
+            self.current_iteration = current_iteration
+        return self.model_manager.design_request_body(context)
+    
+    def _build_design_prompt(self) -> str:
+        """
+        Build the full prompt for the current iteration's design request.
+        
+        Returns:
+            str: Design context followed by feedback from the previous iteration
         """
         # Format the context for the AI
         context = self._format_design_context()
         
         # Get additional context from previous iterations if available
         if self.current_iteration > 1:
-            feedback_context = self._format_feedback_context()
-            context += "\n\n" + feedback_context
+            context = "".join([context, "\n\n", self._format_feedback_context()])
         
-        # Generate the process design
-        self.logger.info("Requesting process design from OpenAI model")
-        response = self.model_manager.generate_process_design(context)
+        return context
+    
+    async def _generate_candidate_designs(self, count: int) -> List[Dict[str, Any]]:
+        """
+        Request several process designs for the current iteration concurrently.
+        
+        Args:
+            count: Number of candidate designs to request
+            
+        Returns:
+            List[Dict]: The candidate process designs
+        """
+        if count == 1:
+            return [await self._generate_process_design()]
+        
+        if self.config["agent"].get("use_batch_api", False):
+            designs = await self._generate_candidate_designs_batch(count)
+            if designs:
+                return designs
+            self.logger.warning("Batch produced no designs, requesting candidates directly")
+        
+        self.logger.info(f"Requesting {count} candidate process designs")
+        
+        async def generate(candidate: int) -> Dict[str, Any]:
+            # Bound the requests in flight; the model manager's token bucket
+            # additionally keeps them under the account rate limits
+            async with self._request_semaphore:
+                return await self._generate_process_design(candidate=candidate)
+        
+        return list(await asyncio.gather(*[generate(index) for index in range(1, count + 1)]))
+    
+    async def _generate_candidate_designs_batch(self, count: int) -> List[Dict[str, Any]]:
+        """
+        Request the current iteration's candidate designs through the OpenAI Batch API.
+        
+        Batch requests cost half as much and draw on a separate rate limit pool,
+        at the price of completing asynchronously (within 24h).
+        
+        Args:
+            count: Number of candidate designs to request
+            
+        Returns:
+            List[Dict]: The candidate process designs that completed successfully
+                (empty if the batch could not be submitted or did not complete)
+        """
+        body = self.model_manager.design_request_body(self._build_design_prompt())
+        requests = [(f"iter_{self.current_iteration}_candidate_{index}", body) for index in range(1, count + 1)]
+        
+        self.logger.info(f"Submitting {count} candidate design requests as a batch")
+        # Both the upload and the polling block, so keep them off the event loop
+        # shared with the other agents
+        try:
+            batch_id = await asyncio.to_thread(self.model_manager.submit_batch, requests)
+            responses = await asyncio.to_thread(
+                self.model_manager.wait_for_batch,
+                batch_id,
+                poll=self.config["agent"].get("batch_poll_interval", 30)
+            )
+        except Exception as e:
+            # A failed, expired or cancelled batch leaves the caller to request
+            # the candidates directly instead of aborting the run
+            self.logger.error(f"Candidate design batch failed: {e}")
+            return []
+        
+        return [
+            await self._generate_process_design(responses[custom_id], candidate=index)
+            for index, (custom_id, _) in enumerate(requests, 1)
+            if custom_id in responses
+        ]
+    
+    async def _generate_process_design(
+        self,
+        response: Optional[Union[str, Dict[str, Any]]] = None,
+        candidate: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Generate a process design using the OpenAI agent.
+        
+        Args:
+            response: Model response obtained ahead of time, either its raw text or the
+                parsed design; requested from the model if not given
+            candidate: Number of the candidate when several are generated concurrently,
+                giving each its own raw response file
+        
+        Returns:
+            Dict: A dictionary containing the process design
+        """
+        if response is None:
+            # Generate the process design
+            self.logger.info("Requesting process design from OpenAI model")
+            response = await self.model_manager.generate_process_design(self._build_design_prompt())
         
         # Parse the response into a structured format
         try:
@@ -238,27 +594,46 @@ class ProcessDesignerAgent:
             if isinstance(response, dict):
                 process_design = response
             else:
-                # Try to extract JSON from the response
-                import re
-                json_match = re.search(r'```json\n([\s\S]*?)\n```', response)
-                if json_match:
-                    process_design = json.loads(json_match.group(1))
-                else:
-                    self.logger.warning("Could not extract JSON from model response, treating entire response as design description")
-                    process_design = {"design_description": response}
+                try:
+                    # Responses are usually bare JSON
+                    process_design = json_utils.loads(response)
+                except json.JSONDecodeError:
+                    # Try to extract JSON from the response
+                    json_match = _JSON_FENCE_RE.search(response)
+                    if json_match:
+                        process_design = json_utils.loads(json_match.group(1))
+                    else:
+                        self.logger.warning("Could not extract JSON from model response, treating entire response as design description")
+                        process_design = {"design_description": response}
         except Exception as e:
             self.logger.error(f"Error parsing process design response: {e}")
             process_design = {"design_description": response}
         
         # Save the raw response if configured to do so
         if self.config["agent"].get("save_agent_responses", False):
-            response_dir = os.path.join(self.output_dir, f"iteration_{self.current_iteration}")
-            os.makedirs(response_dir, exist_ok=True)
-            with open(os.path.join(response_dir, "raw_response.txt"), "w") as f:
-                f.write(str(response))
+            response_dir = self._ensure_dir(os.path.join(self.output_dir, f"iteration_{self.current_iteration}"))
+            file_name = "raw_response.txt" if candidate is None else f"raw_response_{candidate}.txt"
+            self._schedule_write(_write_text, os.path.join(response_dir, file_name), str(response))
         
         return process_design
     
+    def _build_context_template(self) -> None:
+        """
+        Specialize the design prompt template for this run.
+        
+        The inputs (serialized with sorted keys) and the property package are
+        substituted once, leaving only the iteration placeholders.
+        """
+        def literal(text: str) -> str:
+            # Escape "$" so baked-in values are not read as placeholders later
+            return text.replace("$", "$$")
+        
+        self._design_template = Template(_DESIGN_CONTEXT_TEMPLATE.safe_substitute(
+            raw_materials=literal(json_utils.dumps(self.raw_materials, indent=True, sort_keys=True)),
+            product_specs=literal(json_utils.dumps(self.product_specs, indent=True, sort_keys=True)),
+            property_package=literal(self.config['dwsim']['property_package'])
+        ))
+    
     def _format_design_context(self) -> str:
         """
         Format the context information for the agent to generate a process design.
@@ -266,83 +641,10 @@ class ProcessDesignerAgent:
         Returns:
             str: Formatted context string
         """
-        context = f"""
-# Chemical Process Design Task
-
-## Raw Materials
-{json.dumps(self.raw_materials, indent=2)}
-
-## Product Specifications
-{json.dumps(self.product_specs, indent=2)}
-
-## Process Design Requirements
-1. Design a complete chemical process that converts the given raw materials into the specified products.
-2. The process should satisfy all product specifications including purity, yield, and production rate.
-3. The process must satisfy mass and energy balance constraints.
-4. All unit operations must be fully specified with appropriate parameters.
-5. Include material and energy streams between unit operations.
-6. Specify operating conditions (temperature, pressure) for each unit.
-7. Use {self.config['dwsim']['property_package']} as the thermodynamic property package for this design.
-
-## Iteration Information
-This is iteration {self.current_iteration} of a maximum {self.max_iterations} iterations.
-
-## Output Format
-Please provide your process design in JSON format with the following structure:
-```json
-{{
-  "process_name": "Name of the process",
-  "description": "Brief description of the process",
-  "property_package": "{self.config['dwsim']['property_package']}",
-  "unit_operations": [
-    {{
-      "id": "unit-1",
-      "name": "Descriptive name",
-      "type": "reactor/distillation/heat-exchanger/etc.",
-      "specifications": {{
-        // Unit-specific parameters
-      }},
-      "operating_conditions": {{
-        "temperature": value,
-        "temperature_unit": "C/K/F",
-        "pressure": value,
-        "pressure_unit": "kPa/bar/psi",
-        "additional_parameters": {{}}
-      }}
-    }}
-  ],
-  "streams": [
-    {{
-      "id": "stream-1",
-      "name": "Descriptive name",
-      "type": "feed/intermediate/product/utility",
-      "source": "unit-id or 'feed'",
-      "destination": "unit-id or 'product'",
-      "specifications": {{
-        "phase": "liquid/gas/mixed",
-        "temperature": value,
-        "temperature_unit": "C/K/F",
-        "pressure": value,
-        "pressure_unit": "kPa/bar/psi",
-        "flow_rate": value,
-        "flow_rate_unit": "kmol/h or kg/h",
-        "composition": [
-          {{
-            "component": "component name or formula",
-            "fraction": value,
-            "fraction_type": "mole/mass"
-          }}
-        ]
-      }}
-    }}
-  ],
-  "rationale": "Explanation of design choices and expected performance"
-}}
-```
-
-Please provide your detailed process design now.
-"""
-        return context
+        return self._design_template.substitute(
+            iteration=self.current_iteration,
+            max_iterations=self.max_iterations
+        )
     
     def _format_feedback_context(self) -> str:
         """
@@ -351,48 +653,35 @@ Please provide your detailed process design now.
         Returns:
             str: Formatted feedback context
         """
-        # Get the most recent iteration's feedback
+        # Get the most recent iteration's feedback from the in-memory history,
+        # so the request does not wait for the previous iteration's writes
         last_iteration = self.current_iteration - 1
-        last_dir = os.path.join(self.output_dir, f"iteration_{last_iteration}")
-        
-        feedback_file = os.path.join(last_dir, "feedback.json")
-        if not os.path.exists(feedback_file):
+        if not self.history or self.history[-1]["iteration"] != last_iteration:
             return "No feedback available from previous iterations."
         
         try:
-            with open(feedback_file, "r") as f:
-                feedback = json.load(f)
-            
-            context = f"""
-## Feedback from Previous Iteration (Iteration {last_iteration})
-
-### Status: {feedback['status']}
-
-### Issues Found:
-{feedback.get('message', 'No specific issues found.')}
-
-### Specific Feedback:
-"""
-            
-            # Add constraint issues if any
-            if 'constraint_issues' in feedback and feedback['constraint_issues']:
-                context += "\n#### Constraint Issues:\n"
-                for issue in feedback['constraint_issues']:
-                    context += f"- {issue}\n"
-            
-            # Add product specification issues if any
-            if 'product_issues' in feedback and feedback['product_issues']:
-                context += "\n#### Product Specification Issues:\n"
-                for issue in feedback['product_issues']:
-                    context += f"- {issue}\n"
-            
-            # Add suggestions if any
-            if 'suggestions' in feedback and feedback['suggestions']:
-                context += "\n### Improvement Suggestions:\n"
-                for suggestion in feedback['suggestions']:
-                    context += f"- {suggestion}\n"
-            
-            return context
+            feedback = self.history[-1]["feedback"]
+            
+            parts = [
+                f"\n## Feedback from Previous Iteration (Iteration {last_iteration})\n\n",
+                f"### Status: {feedback['status']}\n\n",
+                "### Issues Found:\n",
+                f"{feedback.get('message', 'No specific issues found.')}\n\n",
+                "### Specific Feedback:\n"
+            ]
+            
+            # Add constraint issues, product specification issues and suggestions if any
+            for key, header in (
+                ("constraint_issues", "\n#### Constraint Issues:\n"),
+                ("product_issues", "\n#### Product Specification Issues:\n"),
+                ("suggestions", "\n### Improvement Suggestions:\n")
+            ):
+                items = feedback.get(key)
+                if items:
+                    parts.append(header)
+                    parts.extend(f"- {item}\n" for item in items)
+            
+            return "".join(parts)
             
         except Exception as e:
             self.logger.warning(f"Error reading feedback from previous iteration: {e}")
@@ -429,32 +718,39 @@ Please provide your detailed process design now.
             feedback["constraint_issues"].append(f"Energy balance error: {constraint_results.get('energy_balance_error', 'unknown')}%")
             feedback["suggestions"].append("Review heat duties and enthalpy calculations for energy conservation")
         
+        # Both balances far off: the design is rejected regardless of its products
+        mass_error = constraint_results.get("mass_balance_error")
+        energy_error = constraint_results.get("energy_balance_error")
+        if (
+            not mass_balance_satisfied and not energy_balance_satisfied
+            and isinstance(mass_error, (int, float)) and abs(mass_error) > self._mass_error_cutoff
+            and isinstance(energy_error, (int, float)) and abs(energy_error) > self._energy_error_cutoff
+        ):
+            feedback["status"] = "constraint_violation"
+            feedback["message"] = "Process design violates fundamental constraints"
+            return feedback
+        
         # Check product specifications
         all_products_meet_specs = product_evaluation.get("all_specifications_met", False)
         product_issues = product_evaluation.get("issues", {})
         
+        product_issue_messages = feedback["product_issues"]
+        suggestions = feedback["suggestions"]
         for product_name, issues in product_issues.items():
             for issue_type, details in issues.items():
-                issue_msg = f"{product_name}: {issue_type} - {details}"
-                feedback["product_issues"].append(issue_msg)
+                product_issue_messages.append(f"{product_name}: {issue_type} - {details}")
                 
                 # Generate suggestions based on issue type
-                if issue_type == "purity":
-                    feedback["suggestions"].append(f"Improve separation for {product_name} to increase purity")
-                elif issue_type == "yield":
-                    feedback["suggestions"].append(f"Adjust reaction conditions or improve recovery for {product_name}")
-                elif issue_type == "production_rate":
-                    feedback["suggestions"].append(f"Increase feed rate or improve conversion for {product_name}")
-                elif issue_type == "temperature":
-                    feedback["suggestions"].append(f"Adjust cooling/heating for {product_name} stream")
-                elif issue_type == "pressure":
-                    feedback["suggestions"].append(f"Adjust pressure control for {product_name} stream")
+                suggestion = _ISSUE_SUGGESTIONS.get(issue_type)
+                if suggestion is not None:
+                    suggestions.append(suggestion.format(product=product_name))
         
         # Set overall status
-        if mass_balance_satisfied and energy_balance_satisfied and all_products_meet_specs:
+        constraints_satisfied = mass_balance_satisfied and energy_balance_satisfied
+        if constraints_satisfied and all_products_meet_specs:
             feedback["status"] = "success"
             feedback["message"] = "Process design meets all requirements and constraints!"
-        elif not (mass_balance_satisfied and energy_balance_satisfied):
+        elif not constraints_satisfied:
             feedback["status"] = "constraint_violation"
             feedback["message"] = "Process design violates fundamental constraints"
         else:
@@ -474,8 +770,6 @@ Please provide your detailed process design now.
         Returns:
             float: Score for the current design (higher is better)
         """
-        score = 0.0
-        
         # Base score of 100
         score = 100.0
         
@@ -488,16 +782,12 @@ Please provide your detailed process design now.
         
         # Subtract for product specification issues
         product_scores = product_evaluation.get("product_scores", {})
-        for product_name, product_score in product_scores.items():
-            # Normalize the product score to 0-100 scale
-            normalized_score = product_score * 100
-            
-            # Calculate weighted average of all product scores
-            num_products = len(product_scores)
-            product_weight = 1.0 / num_products if num_products > 0 else 0
-            
-            # Adjust score based on how well products meet specifications
-            score -= (100 - normalized_score) * product_weight
+        if product_scores:
+            # Weighted average of all product scores, each normalized to a 0-100 scale
+            product_weight = 1.0 / len(product_scores)
+            for product_score in product_scores.values():
+                # Adjust score based on how well products meet specifications
+                score -= (100 - product_score * 100) * product_weight
         
         return max(0.0, score)
     
@@ -506,7 +796,10 @@ Please provide your detailed process design now.
         iteration_dir: str, 
         process_design: Dict[str, Any],
         simulation_results: Optional[Dict[str, Any]], 
-        feedback: Dict[str, Any]
+        feedback: Dict[str, Any],
+        design_dir: Optional[str] = None,
+        evaluation: Optional[Dict[str, Any]] = None,
+        score: Optional[float] = None
     ) -> None:
         """
         Record the results of the current iteration.
@@ -516,29 +809,42 @@ Please provide your detailed process design now.
             process_design: Process design dictionary
             simulation_results: Simulation results (if available)
             feedback: Feedback dictionary
+            design_dir: Directory holding the selected design's files (defaults to iteration_dir)
+            evaluation: Evaluation of the simulation results (if available)
+            score: Design score (if the design could be evaluated)
         """
+        design_dir = design_dir or iteration_dir
+        
         # Save feedback
         feedback_path = os.path.join(iteration_dir, "feedback.json")
-        with open(feedback_path, "w") as f:
-            json.dump(feedback, f, indent=2)
+        self._schedule_write(_write_json, feedback_path, feedback)
         
         # Add to history
         iteration_record = {
             "iteration": self.current_iteration,
             "timestamp": datetime.now().isoformat(),
-            "process_design_path": os.path.join(iteration_dir, "process_design.json"),
+            "process_design_path": os.path.join(design_dir, "process_design.json"),
             "feedback": feedback,
         }
         
         if simulation_results:
-            iteration_record["simulation_results_path"] = os.path.join(iteration_dir, "simulation_results.json")
+            iteration_record["simulation_results_path"] = os.path.join(design_dir, "simulation_results.json")
+        
+        # Keep the numeric results in a compact record so plotting needs no file reads
+        metrics = IterationMetrics(iteration=self.current_iteration)
+        if evaluation:
+            constraint_check = evaluation.get("constraint_check", {})
+            metrics.score = score
+            metrics.mass_balance_error = constraint_check.get("mass_balance_error")
+            metrics.energy_balance_error = constraint_check.get("energy_balance_error")
+            metrics.product_scores = evaluation.get("product_evaluation", {}).get("product_scores", {})
+            iteration_record["metrics"] = asdict(metrics)
+        self.metrics.append(metrics)
         
         self.history.append(iteration_record)
         
-        # Save updated history
-        history_path = os.path.join(self.output_dir, "iteration_history.json")
-        with open(history_path, "w") as f:
-            json.dump(self.history, f, indent=2)
+        # Append only the new record instead of rewriting the whole history
+        self._schedule_write(_append_json_line, self._history_path, iteration_record)
     
     def _generate_final_report(self) -> None:
         """Generate a final report summarizing the design process and results."""
@@ -586,8 +892,7 @@ Please provide your detailed process design now.
         
         # Save the report
         report_path = os.path.join(self.output_dir, "final_report.json")
-        with open(report_path, "w") as f:
-            json.dump(report, f, indent=2)
+        _write_json(report_path, report)
         
         self.logger.info(f"Final report saved to {report_path}")
         
@@ -595,79 +900,62 @@ Please provide your detailed process design now.
         if self.config["simulation"].get("generate_plots", False):
             self._generate_performance_plots()
     
+    @classmethod
+    def _plotting_modules(cls) -> Tuple[Any, Any]:
+        """
+        Import matplotlib and numpy on first use.
+        
+        They are only needed for the optional performance plots, and
+        matplotlib in particular is slow to import.
+        
+        Returns:
+            Tuple: The matplotlib.pyplot and numpy modules
+        """
+        if cls._plt is None:
+            import matplotlib.pyplot as plt
+            import numpy as np
+            cls._plt = plt
+            cls._np = np
+        return cls._plt, cls._np
+    
     def _generate_performance_plots(self) -> None:
         """Generate performance plots for the design process."""
         try:
-            import matplotlib.pyplot as plt
-            import numpy as np
+            plt, np = self._plotting_modules()
             
-            # Extract iteration data
-            iterations = []
-            scores = []
-            mass_balance_errors = []
-            energy_balance_errors = []
+            # Extract iteration data; scores and balance errors are recorded as
+            # each iteration completes (missing errors plot as gaps)
+            count = len(self.metrics)
             
-            for i, record in enumerate(self.history, start=1):
-                iterations.append(i)
-                
-                # Try to load the evaluation file
-                eval_path = os.path.join(self.output_dir, f"iteration_{i}", "evaluation.json")
-                if os.path.exists(eval_path):
-                    with open(eval_path, "r") as f:
-                        evaluation = json.load(f)
-                        
-                    # Extract scores (calculate if not present)
-                    score = self._calculate_design_score(
-                        evaluation["constraint_check"], 
-                        evaluation["product_evaluation"]
-                    ) if "constraint_check" in evaluation and "product_evaluation" in evaluation else 0
-                    scores.append(score)
-                    
-                    # Extract mass balance errors
-                    mass_error = evaluation.get("constraint_check", {}).get("mass_balance_error", None)
-                    mass_balance_errors.append(mass_error if mass_error is not None else np.nan)
-                    
-                    # Extract energy balance errors
-                    energy_error = evaluation.get("constraint_check", {}).get("energy_balance_error", None)
-                    energy_balance_errors.append(energy_error if energy_error is not None else np.nan)
-                else:
-                    scores.append(0)
-                    mass_balance_errors.append(np.nan)
-                    energy_balance_errors.append(np.nan)
+            def metric(name: str, missing: float) -> np.ndarray:
+                values = (getattr(metrics, name) for metrics in self.metrics)
+                return np.fromiter(
+                    (missing if value is None else value for value in values), dtype=np.float64, count=count
+                )
             
-            # Create figures directory
-            figures_dir = os.path.join(self.output_dir, "figures")
-            os.makedirs(figures_dir, exist_ok=True)
+            iterations = np.arange(1, count + 1)
+            scores = metric("score", 0.0)
+            mass_balance_errors = metric("mass_balance_error", np.nan)
+            energy_balance_errors = metric("energy_balance_error", np.nan)
             
-            # Plot design scores
-            plt.figure(figsize=(10, 6))
-            plt.plot(iterations, scores, 'o-', color='blue')
-            plt.xlabel('Iteration')
-            plt.ylabel('Design Score')
-            plt.title('Design Score by Iteration')
-            plt.grid(True)
-            plt.savefig(os.path.join(figures_dir, 'design_scores.png'))
-            plt.close()
-            
-            # Plot mass balance errors
-            plt.figure(figsize=(10, 6))
-            plt.plot(iterations, mass_balance_errors, 'o-', color='red')
-            plt.xlabel('Iteration')
-            plt.ylabel('Mass Balance Error (%)')
-            plt.title('Mass Balance Error by Iteration')
-            plt.grid(True)
-            plt.savefig(os.path.join(figures_dir, 'mass_balance_errors.png'))
-            plt.close()
-            
-            # Plot energy balance errors
-            plt.figure(figsize=(10, 6))
-            plt.plot(iterations, energy_balance_errors, 'o-', color='green')
-            plt.xlabel('Iteration')
-            plt.ylabel('Energy Balance Error (%)')
-            plt.title('Energy Balance Error by Iteration')
-            plt.grid(True)
-            plt.savefig(os.path.join(figures_dir, 'energy_balance_errors.png'))
-            plt.close()
+            # Create figures directory
+            figures_dir = self._ensure_dir(os.path.join(self.output_dir, "figures"))
+            
+            # Plot all metrics in a single figure
+            fig, (score_ax, mass_ax, energy_ax) = plt.subplots(3, 1, figsize=(10, 18), sharex=True)
+            for ax, values, color, label in (
+                (score_ax, scores, 'blue', 'Design Score'),
+                (mass_ax, mass_balance_errors, 'red', 'Mass Balance Error (%)'),
+                (energy_ax, energy_balance_errors, 'green', 'Energy Balance Error (%)')
+            ):
+                ax.plot(iterations, values, 'o-', color=color)
+                ax.set_ylabel(label)
+                ax.set_title(f"{label.replace(' (%)', '')} by Iteration")
+                ax.grid(True)
+            energy_ax.set_xlabel('Iteration')
+            fig.tight_layout()
+            fig.savefig(os.path.join(figures_dir, 'performance.png'))
+            plt.close(fig)
             
             self.logger.info(f"Performance plots saved to {figures_dir}")
             
@@ -5,12 +5,44 @@ Model Converter module for converting agent designs to DWSIM models.
 import os
 import json
 import logging
-from typing import Dict, Any, List, Optional
-import xml.etree.ElementTree as ET
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+try:
+    from lxml import etree as ET
+except ImportError:
+    import xml.etree.ElementTree as ET
 import uuid
 
 from src.utils.logger import get_logger
 
+# Map agent unit types to DWSIM unit operation types
+_UNIT_TYPE_MAP = {
+    "reactor": "CSTR",
+    "distillation_column": "DistillationColumn",
+    "heat_exchanger": "HeatExchanger",
+    "pump": "Pump"
+}
+
+def _emit_reactor(unit_elem: ET.Element, unit: Dict[str, Any]) -> None:
+    """Add reactor parameters to a unit operation element."""
+    ET.SubElement(unit_elem, "ReactionID").text = unit.get("reaction_id", "")
+    ET.SubElement(unit_elem, "Volume").text = str(unit.get("volume", 0.0))
+
+def _emit_distillation_column(unit_elem: ET.Element, unit: Dict[str, Any]) -> None:
+    """Add distillation column parameters to a unit operation element."""
+    ET.SubElement(unit_elem, "NumberOfTrays").text = str(unit.get("num_trays", 10))
+    ET.SubElement(unit_elem, "RefluxRatio").text = str(unit.get("reflux_ratio", 1.5))
+
+def _emit_heat_exchanger(unit_elem: ET.Element, unit: Dict[str, Any]) -> None:
+    """Add heat exchanger parameters to a unit operation element."""
+    ET.SubElement(unit_elem, "HeatDuty").text = str(unit.get("heat_duty", 0.0))
+
+# Agent unit types with type-specific parameters, mapped to the function adding them
+_PARAMETER_EMITTERS = {
+    "reactor": _emit_reactor,
+    "distillation_column": _emit_distillation_column,
+    "heat_exchanger": _emit_heat_exchanger
+}
+
 class ModelConverter:
     """
     Converts process designs from the agent into DWSIM model files.
@@ -33,52 +65,129 @@ class ModelConverter:
         self.logger.info(f"Converting process design to DWSIM model")
         
         # Create the root element
-        dwsim_file = ET.Element("DWSIM")
-        dwsim_file.set("Version", "5.0")  # Use appropriate version
+        dwsim_file = ET.Element("DWSIM", Version="5.0")  # Use appropriate version
         
-        # Add simulation info
-        sim_info = ET.SubElement(dwsim_file, "SimulationInfo")
-        ET.SubElement(sim_info, "Name").text = process_design.get("process_name", "Agent Generated Process")
-        ET.SubElement(sim_info, "Description").text = process_design.get("description", "")
-        ET.SubElement(sim_info, "ID").text = str(uuid.uuid4())
-        
-        # Add property package info
-        property_pkg = ET.SubElement(dwsim_file, "PropertyPackages")
-        pp = ET.SubElement(property_pkg, "PropertyPackage")
-        ET.SubElement(pp, "Name").text = process_design.get("property_package", "NRTL")
-        
-        # Add compounds based on raw materials and products
-        compounds = self._extract_compounds(process_design)
-        compounds_element = ET.SubElement(dwsim_file, "Compounds")
-        for compound in compounds:
-            comp_elem = ET.SubElement(compounds_element, "Compound")
-            ET.SubElement(comp_elem, "Name").text = compound["name"]
-            ET.SubElement(comp_elem, "Formula").text = compound["formula"]
-            ET.SubElement(comp_elem, "ID").text = str(uuid.uuid4())
+        # Add simulation info, property package and compounds
+        self._create_simulation_info(dwsim_file, process_design)
+        self._create_property_packages(dwsim_file, process_design)
+        self._create_compounds(dwsim_file, process_design)
         
         # Add unit operations
         unit_ops = ET.SubElement(dwsim_file, "UnitOperations")
         unit_mapping = {}  # Map unit IDs to their XML elements
         
         for unit in process_design.get("unit_operations", []):
-            unit_elem = self._create_unit_operation(unit)
-            unit_ops.append(unit_elem)
-            unit_mapping[unit["id"]] = unit_elem
+            unit_mapping[unit["id"]] = self._create_unit_operation(unit_ops, unit)
         
         # Add streams
         streams = ET.SubElement(dwsim_file, "Streams")
         stream_mapping = {}  # Map stream IDs to their XML elements
         
         for stream in process_design.get("streams", []):
-            stream_elem = self._create_stream(stream)
-            streams.append(stream_elem)
-            stream_mapping[stream["id"]] = stream_elem
+            stream_mapping[stream["id"]] = self._create_stream(streams, stream)
         
         # Connect streams to unit operations
         self._connect_streams_to_units(streams, unit_mapping, stream_mapping, process_design)
         
         self.logger.info("DWSIM model conversion completed")
         return dwsim_file
+
+    def save_model(self, process_design: Dict[str, Any], model_path: str) -> None:
+        """
+        Convert a process design and write it to a DWSIM model file.
+        
+        With lxml the document is streamed to disk one unit operation or stream
+        at a time instead of being built in memory and serialized afterwards.
+        
+        Args:
+            process_design: Process design dictionary
+            model_path: Path of the model file to write
+        """
+        if not hasattr(ET, "xmlfile"):
+            # The standard library has no incremental writer
+            tree = ET.ElementTree(self.convert_design_to_dwsim(process_design))
+            tree.write(model_path, encoding="utf-8", xml_declaration=True)
+            return
+        
+        self.logger.info(f"Streaming DWSIM model to {model_path}")
+        units = process_design.get("unit_operations", [])
+        ports = self._index_unit_ports(process_design, {unit["id"] for unit in units})
+        # Elements are built under a scratch parent, written out and dropped again
+        scratch = ET.Element("DWSIM")
+        
+        with ET.xmlfile(model_path, encoding="utf-8") as xf:
+            xf.write_declaration()
+            with xf.element("DWSIM", Version="5.0"):
+                xf.write(self._create_simulation_info(scratch, process_design))
+                xf.write(self._create_property_packages(scratch, process_design))
+                xf.write(self._create_compounds(scratch, process_design))
+                scratch.clear()
+                
+                with xf.element("UnitOperations"):
+                    for unit in units:
+                        unit_elem = self._create_unit_operation(scratch, unit)
+                        self._add_ports(unit_elem, ports.get(unit["id"], ()))
+                        xf.write(unit_elem)
+                        scratch.clear()
+                
+                with xf.element("Streams"):
+                    for stream in process_design.get("streams", []):
+                        xf.write(self._create_stream(scratch, stream))
+                        scratch.clear()
+        
+        self.logger.info("DWSIM model conversion completed")
+    
+    def _create_simulation_info(self, parent: ET.Element, process_design: Dict[str, Any]) -> ET.Element:
+        """
+        Create the simulation info XML element under a parent.
+        
+        Args:
+            parent: Element to add the simulation info to
+            process_design: Process design dictionary
+            
+        Returns:
+            ET.Element: Simulation info XML element
+        """
+        sim_info = ET.SubElement(parent, "SimulationInfo")
+        ET.SubElement(sim_info, "Name").text = process_design.get("process_name", "Agent Generated Process")
+        ET.SubElement(sim_info, "Description").text = process_design.get("description", "")
+        ET.SubElement(sim_info, "ID").text = str(uuid.uuid4())
+        return sim_info
+    
+    def _create_property_packages(self, parent: ET.Element, process_design: Dict[str, Any]) -> ET.Element:
+        """
+        Create the property packages XML element under a parent.
+        
+        Args:
+            parent: Element to add the property packages to
+            process_design: Process design dictionary
+            
+        Returns:
+            ET.Element: Property packages XML element
+        """
+        property_pkg = ET.SubElement(parent, "PropertyPackages")
+        pp = ET.SubElement(property_pkg, "PropertyPackage")
+        ET.SubElement(pp, "Name").text = process_design.get("property_package", "NRTL")
+        return property_pkg
+    
+    def _create_compounds(self, parent: ET.Element, process_design: Dict[str, Any]) -> ET.Element:
+        """
+        Create the compounds XML element from the raw materials and products under a parent.
+        
+        Args:
+            parent: Element to add the compounds to
+            process_design: Process design dictionary
+            
+        Returns:
+            ET.Element: Compounds XML element
+        """
+        compounds_element = ET.SubElement(parent, "Compounds")
+        for compound in self._extract_compounds(process_design):
+            comp_elem = ET.SubElement(compounds_element, "Compound")
+            ET.SubElement(comp_elem, "Name").text = compound["name"]
+            ET.SubElement(comp_elem, "Formula").text = compound["formula"]
+            ET.SubElement(comp_elem, "ID").text = str(uuid.uuid4())
+        return compounds_element
     
     def _extract_compounds(self, process_design: Dict[str, Any]) -> List[Dict[str, str]]:
         """
@@ -90,62 +199,52 @@ class ModelConverter:
         Returns:
             List of compounds with name and formula
         """
-        compounds = {}
+        seen = set()
+        compounds = []
         for stream in process_design.get("streams", []):
             for compound in stream.get("compounds", []):
                 name = compound["name"]
-                if name not in compounds:
-                    compounds[name] = {"name": name, "formula": compound.get("formula", name)}
-        return list(compounds.values())
+                if name in seen:
+                    continue
+                seen.add(name)
+                compounds.append({"name": name, "formula": compound.get("formula", name)})
+        return compounds
 
-    def _create_unit_operation(self, unit: Dict[str, Any]) -> ET.Element:
+    def _create_unit_operation(self, parent: ET.Element, unit: Dict[str, Any]) -> ET.Element:
         """
-        Create a unit operation XML element based on the agent's unit specification.
+        Create a unit operation XML element under a parent based on the agent's unit specification.
         
         Args:
+            parent: Element to add the unit operation to
             unit: Unit operation dictionary
             
         Returns:
             ET.Element: Unit operation XML element
         """
         unit_type = unit.get("type", "").lower()
-        unit_elem = ET.Element("UnitOperation")
-        unit_elem.set("ID", str(unit["id"]))
-
-        # Map agent unit types to DWSIM unit operation types
-        unit_mapping = {
-            "reactor": "CSTR",
-            "distillation_column": "DistillationColumn",
-            "heat_exchanger": "HeatExchanger",
-            "pump": "Pump"
-        }
-        dwsim_type = unit_mapping.get(unit_type, "CustomUnit")
-        unit_elem.set("Type", dwsim_type)
+        dwsim_type = _UNIT_TYPE_MAP.get(unit_type, "CustomUnit")
+        # Creating the element in place avoids moving it between documents under lxml
+        unit_elem = ET.SubElement(parent, "UnitOperation", ID=str(unit["id"]), Type=dwsim_type)
 
         # Add parameters based on unit type
-        if unit_type == "reactor":
-            ET.SubElement(unit_elem, "ReactionID").text = unit.get("reaction_id", "")
-            ET.SubElement(unit_elem, "Volume").text = str(unit.get("volume", 0.0))
-        elif unit_type == "distillation_column":
-            ET.SubElement(unit_elem, "NumberOfTrays").text = str(unit.get("num_trays", 10))
-            ET.SubElement(unit_elem, "RefluxRatio").text = str(unit.get("reflux_ratio", 1.5))
-        elif unit_type == "heat_exchanger":
-            ET.SubElement(unit_elem, "HeatDuty").text = str(unit.get("heat_duty", 0.0))
+        emit = _PARAMETER_EMITTERS.get(unit_type)
+        if emit is not None:
+            emit(unit_elem, unit)
 
         return unit_elem
 
-    def _create_stream(self, stream: Dict[str, Any]) -> ET.Element:
+    def _create_stream(self, parent: ET.Element, stream: Dict[str, Any]) -> ET.Element:
         """
-        Create a stream XML element based on the agent's stream specification.
+        Create a stream XML element under a parent based on the agent's stream specification.
         
         Args:
+            parent: Element to add the stream to
             stream: Stream dictionary
             
         Returns:
             ET.Element: Stream XML element
         """
-        stream_elem = ET.Element("Stream")
-        stream_elem.set("ID", str(stream["id"]))
+        stream_elem = ET.SubElement(parent, "Stream", ID=str(stream["id"]))
         
         ET.SubElement(stream_elem, "Temperature").text = str(stream.get("temperature", 298.15))  # K
         ET.SubElement(stream_elem, "Pressure").text = str(stream.get("pressure", 101325))      # Pa
@@ -154,9 +253,8 @@ class ModelConverter:
         # Add composition
         comp_elem = ET.SubElement(stream_elem, "Composition")
         for compound in stream.get("compounds", []):
-            c_elem = ET.SubElement(comp_elem, "Compound")
-            c_elem.set("Name", compound["name"])
-            c_elem.set("MoleFraction", str(compound.get("mole_fraction", 0.0)))
+            ET.SubElement(comp_elem, "Compound", Name=compound["name"],
+                          MoleFraction=str(compound.get("mole_fraction", 0.0)))
 
         return stream_elem
 
@@ -171,17 +269,41 @@ class ModelConverter:
             stream_mapping: Mapping of stream IDs to XML elements
             process_design: Process design dictionary
         """
+        for unit_id, unit_ports in self._index_unit_ports(process_design, unit_mapping).items():
+            self._add_ports(unit_mapping[unit_id], unit_ports)
+
+    def _index_unit_ports(self, process_design: Dict[str, Any],
+                          unit_ids: Iterable[str]) -> Dict[str, List[Tuple[str, str]]]:
+        """
+        Collect the inlet and outlet ports of every unit operation from the connections.
+        
+        Args:
+            process_design: Process design dictionary
+            unit_ids: IDs of the unit operations in the design
+            
+        Returns:
+            Mapping of unit IDs to (port tag, stream ID) pairs in connection order
+        """
+        ports = {}
         for conn in process_design.get("connections", []):
             from_id = conn.get("from")
             to_id = conn.get("to")
             stream_id = conn.get("stream_id")
 
-            if from_id and stream_id and from_id in unit_mapping:
-                unit_elem = unit_mapping[from_id]
-                outlet = ET.SubElement(unit_elem, "Outlet")
-                outlet.set("StreamID", str(stream_id))
+            if from_id and stream_id and from_id in unit_ids:
+                ports.setdefault(from_id, []).append(("Outlet", str(stream_id)))
+
+            if to_id and stream_id and to_id in unit_ids:
+                ports.setdefault(to_id, []).append(("Inlet", str(stream_id)))
+        return ports
 
-            if to_id and stream_id and to_id in unit_mapping:
-                unit_elem = unit_mapping[to_id]
-                inlet = ET.SubElement(unit_elem, "Inlet")
-                inlet.set("StreamID", str(stream_id))
\ No newline at end of file
+    def _add_ports(self, unit_elem: ET.Element, unit_ports: Iterable[Tuple[str, str]]) -> None:
+        """
+        Add inlet and outlet elements to a unit operation XML element.
+        
+        Args:
+            unit_elem: Unit operation XML element
+            unit_ports: (port tag, stream ID) pairs
+        """
+        for tag, stream_id in unit_ports:
+            ET.SubElement(unit_elem, tag, StreamID=stream_id)
@@ -3,7 +3,13 @@ Property Package module for handling thermodynamic property packages in DWSIM mo
 """
 
 from typing import Dict, Any
-import xml.etree.ElementTree as ET
+try:
+    from lxml import etree as ET
+except ImportError:
+    import xml.etree.ElementTree as ET
+
+# Property packages the converter knows how to configure
+_SUPPORTED_PACKAGES = frozenset({"NRTL", "UNIQUAC", "Peng-Robinson", "Soave-Redlich-Kwong"})
 
 class PropertyPackageHandler:
     """
@@ -12,7 +18,7 @@ class PropertyPackageHandler:
     
     def __init__(self):
         """Initialize the PropertyPackageHandler."""
-        self.supported_packages = ["NRTL", "UNIQUAC", "Peng-Robinson", "Soave-Redlich-Kwong"]
+        self.supported_packages = _SUPPORTED_PACKAGES
 
     def create_property_package(self, process_design: Dict[str, Any]) -> ET.Element:
         """
@@ -24,21 +30,18 @@ class PropertyPackageHandler:
         Returns:
             ET.Element: Property package XML element
         """
-        pp_elem = ET.Element("PropertyPackage")
         pp_name = process_design.get("property_package", "NRTL")
         
         if pp_name not in self.supported_packages:
             pp_name = "NRTL"  # Default fallback
-        pp_elem.set("Name", pp_name)
+        pp_elem = ET.Element("PropertyPackage", Name=pp_name)
 
         # Add interaction parameters if specified
         if "interaction_parameters" in process_design:
             ip_elem = ET.SubElement(pp_elem, "InteractionParameters")
             for param in process_design["interaction_parameters"]:
-                param_elem = ET.SubElement(ip_elem, "Parameter")
-                param_elem.set("Compound1", param["compound1"])
-                param_elem.set("Compound2", param["compound2"])
-                param_elem.set("Value", str(param["value"]))
+                ET.SubElement(ip_elem, "Parameter", Compound1=param["compound1"],
+                              Compound2=param["compound2"], Value=str(param["value"]))
 
         return pp_elem
 
@@ -0,0 +1,64 @@
+"""
+Schema module for normalized process designs.
+
+Process designs arrive from the model as loosely structured dictionaries.
+Normalizing one once fills in every default up front, so that checks read
+plain attributes instead of repeating dict.get lookups per stream and unit.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple, Union
+
+@dataclass(slots=True, frozen=True)
+class UnitOperation:
+    """Unit operation of a process design."""
+    id: Any
+    type: str
+    volume: float = 0.0
+    num_trays: int = 0
+
+@dataclass(slots=True, frozen=True)
+class Connection:
+    """Connection of a stream from one unit operation to another."""
+    source: Optional[Any]
+    target: Optional[Any]
+    stream_id: Optional[Any]
+
+@dataclass(slots=True, frozen=True)
+class NormalizedDesign:
+    """Process design with all fields present and defaults applied."""
+    unit_operations: Tuple[UnitOperation, ...]
+    connections: Tuple[Connection, ...]
+    feed_flows: Tuple[float, ...]
+    product_flows: Tuple[float, ...]
+
+def normalize(process_design: Union[Dict[str, Any], NormalizedDesign]) -> NormalizedDesign:
+    """
+    Normalize a process design dictionary.
+
+    Args:
+        process_design: Process design dictionary, or an already normalized design
+
+    Returns:
+        NormalizedDesign: The normalized design
+    """
+    if isinstance(process_design, NormalizedDesign):
+        return process_design
+
+    return NormalizedDesign(
+        unit_operations=tuple(
+            UnitOperation(
+                id=unit.get("id"),
+                type=unit.get("type", "").lower(),
+                volume=unit.get("volume", 0.0),
+                num_trays=unit.get("num_trays", 0)
+            )
+            for unit in process_design.get("unit_operations", [])
+        ),
+        connections=tuple(
+            Connection(source=conn.get("from"), target=conn.get("to"), stream_id=conn.get("stream_id"))
+            for conn in process_design.get("connections", [])
+        ),
+        feed_flows=tuple(stream.get("mass_flow", 0.0) for stream in process_design.get("feeds", [])),
+        product_flows=tuple(stream.get("mass_flow", 0.0) for stream in process_design.get("products", []))
+    )
@@ -4,114 +4,51 @@ Handles interactions with the DWSIM process simulator.
 """
 
 import os
-import sys
 import json
-import logging
+import functools
+import hashlib
 import subprocess
 import time
-from typing import Dict, Any, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Tuple
 import platform
+from string import Template
 
+from src.utils import json_utils
 from src.utils.logger import get_logger
 
-class DWSIMSimulator:
-    """
-    Interface to the DWSIM process simulator.
-    """
-    
-    def __init__(
-        self,
-        dwsim_path: str,
-        property_package: str = "NRTL",
-        calculation_mode: str = "Sequential",
-        timeout: int = 300
-    ):
-        """
-        Initialize the DWSIM simulator interface.
-        
-        Args:
-            dwsim_path: Path to the DWSIM installation
-            property_package: Thermodynamic property package to use
-            calculation_mode: DWSIM calculation mode (Sequential or Equation-Oriented)
-            timeout: Maximum simulation runtime in seconds
-        """
-        self.logger = get_logger(__name__)
-        self.dwsim_path = dwsim_path
-        self.property_package = property_package
-        self.calculation_mode = calculation_mode
-        self.timeout = timeout
-        
-        # Check if running on Linux and set up mono if needed
-        self.is_linux = platform.system() == "Linux"
-        
-        # Validate DWSIM installation
-        self._validate_dwsim_installation()
-    
-    def _validate_dwsim_installation(self) -> None:
-        """
-        Validate that the DWSIM installation is accessible.
-        
-        Raises:
-            FileNotFoundError: If DWSIM is not found
-        """
-        if self.is_linux:
-            # Check for DWSIM on Linux
-            if not os.path.exists(self.dwsim_path):
-                self.logger.error(f"DWSIM installation not found at: {self.dwsim_path}")
-                raise FileNotFoundError(f"DWSIM installation not found at: {self.dwsim_path}")
-            
-            # Check for mono installation
-            try:
-                process = subprocess.run(["mono", "--version"], 
-                                        stdout=subprocess.PIPE, 
-                                        stderr=subprocess.PIPE,
-                                        check=False)
-                if process.returncode != 0:
-                    self.logger.error("Mono runtime not found. Please install mono-complete.")
-                    raise RuntimeError("Mono runtime not found. Please install mono-complete.")
-                else:
-                    mono_version = process.stdout.decode('utf-8').split('\n')[0]
-                    self.logger.info(f"Found Mono runtime: {mono_version}")
-            except FileNotFoundError:
-                self.logger.error("Mono runtime not found. Please install mono-complete.")
-                raise RuntimeError("Mono runtime not found. Please install mono-complete.")
-        else:
-            # Check for DWSIM on Windows
-            dwsim_exe = os.path.join(self.dwsim_path, "DWSIM.exe")
-            if not os.path.exists(dwsim_exe):
-                self.logger.error(f"DWSIM executable not found at: {dwsim_exe}")
-                raise FileNotFoundError(f"DWSIM executable not found at: {dwsim_exe}")
-        
-        self.logger.info(f"DWSIM installation validated at: {self.dwsim_path}")
-    
-    def _get_dwsim_automation_script(self, model_path: str, results_path: str) -> str:
-        """
-        Generate a Python script for automating DWSIM through its API.
-        
-        Args:
-            model_path: Path to the DWSIM model file
-            results_path: Path to save simulation results
-            
-        Returns:
-            str: Python script for DWSIM automation
-        """
-        # Script to run the simulation and extract results
-        return f"""#!/usr/bin/env python3
+# Script run by DWSIM to load a model, solve it and dump the results as JSON.
+# Compiled once; the ${...} placeholders are filled with Python string literals.
+_SCRIPT_TMPL = Template(r"""#!/usr/bin/env python3
 import os
 import sys
 import json
+import math
 import traceback
+
+# Results are read back by the agent only, so they are written compactly
+try:
+    import orjson
+    
+    def write_results(data):
+        with open(results_path, 'wb') as f:
+            f.write(orjson.dumps(data))
+except ImportError:
+    def write_results(data):
+        with open(results_path, 'w') as f:
+            json.dump(data, f, separators=(",", ":"))
+
 try:
     # Set up paths
-    model_path = "{model_path.replace('\\', '\\\\')}"
-    results_path = "{results_path.replace('\\', '\\\\')}"
+    model_path = ${model_path}
+    results_path = ${results_path}
     
     # Load DWSIM API using clr/pythonnet
     import clr
     import System
     
     # Add DWSIM references
-    sys.path.append("{self.dwsim_path.replace('\\', '\\\\')}")
+    sys.path.append(${dwsim_path})
     clr.AddReference("DWSIM")
     clr.AddReference("DWSIM.Interfaces")
     clr.AddReference("DWSIM.Thermodynamics")
@@ -130,32 +67,34 @@ try:
     sim.LoadFromFile(model_path)
     
     # Set calculation mode
-    sim.CalculationMode = "{self.calculation_mode}"
+    sim.CalculationMode = ${calculation_mode}
     
     # Run simulation
     print("Running simulation...")
-    sim.RunAsyncException += lambda sender, e: print(f"Simulation error: {{e.Exception.Message}}")
+    sim.RunAsyncException += lambda sender, e: print(f"Simulation error: {e.Exception.Message}")
     success = sim.RunAllCalculators()
     
     if not success:
         print("Simulation failed to converge.")
-        results = {{"status": "error", "message": "Simulation failed to converge."}}
+        results = {"status": "error", "message": "Simulation failed to converge."}
     else:
         print("Simulation completed successfully.")
         
         # Extract results
-        results = {{
+        results = {
             "status": "success",
-            "streams": {{}},
-            "unit_operations": {{}},
-            "mass_balance": {{}},
-            "energy_balance": {{}}
-        }}
+            "streams": {},
+            "unit_operations": {},
+            "mass_balance": {},
+            "energy_balance": {}
+        }
         
-        # Process streams
+        # Process streams, collecting the boundary flows for the mass balance
+        input_flows = []
+        output_flows = []
         for stream_id, stream in sim.MaterialStreams.Items():
             ms = stream.Item2
-            stream_data = {{
+            stream_data = {
                 "name": ms.GraphicObject.Tag,
                 "from": ms.GraphicObject.InputConnectors[0].ConnectedObject.Tag if ms.GraphicObject.InputConnectors[0].IsAttached else "none",
                 "to": ms.GraphicObject.OutputConnectors[0].ConnectedObject.Tag if ms.GraphicObject.OutputConnectors[0].IsAttached else "none",
@@ -166,32 +105,37 @@ try:
                 "total_flow": float(ms.MassFlow),
                 "flow_unit": "kg/h",
                 "phase": str(ms.Phase.ToString()),
-                "components": {{}}
-            }}
+                "components": {}
+            }
             
             # Add component data
             for i in range(ms.Components.Count):
                 comp = ms.Components[i]
-                stream_data["components"][comp.Name] = {{
+                stream_data["components"][comp.Name] = {
                     "formula": comp.Formula,
                     "mole_fraction": float(comp.MoleFraction),
                     "mass_fraction": float(comp.MassFraction),
                     "mole_flow": float(comp.MolarFlow),
                     "mass_flow": float(comp.MassFlow)
-                }}
+                }
             
             results["streams"][ms.GraphicObject.Tag] = stream_data
+            
+            if stream_data["from"] == "none":  # Input stream
+                input_flows.append(stream_data["total_flow"])
+            elif stream_data["to"] == "none":  # Output stream
+                output_flows.append(stream_data["total_flow"])
         
         # Process unit operations
         for unit_id, unit in sim.UnitOperations.Items():
             unit_obj = unit.Item2
-            unit_data = {{
+            unit_data = {
                 "name": unit_obj.GraphicObject.Tag,
                 "type": unit_obj.GetType().Name,
                 "inputs": [],
                 "outputs": [],
-                "parameters": {{}}
-            }}
+                "parameters": {}
+            }
             
             # Get input and output connections
             for connector in unit_obj.GraphicObject.InputConnectors:
@@ -217,25 +161,20 @@ try:
             
             results["unit_operations"][unit_obj.GraphicObject.Tag] = unit_data
         
-        # Calculate mass balance
-        total_input_mass = 0.0
-        total_output_mass = 0.0
-        
-        for stream_id, stream_data in results["streams"].items():
-            if stream_data["from"] == "none":  # Input stream
-                total_input_mass += stream_data["total_flow"]
-            elif stream_data["to"] == "none":  # Output stream
-                total_output_mass += stream_data["total_flow"]
+        # Calculate mass balance; fsum keeps small streams from being lost
+        # next to large ones
+        total_input_mass = math.fsum(input_flows)
+        total_output_mass = math.fsum(output_flows)
         
         mass_balance_error = 100.0
         if total_input_mass > 0:
             mass_balance_error = abs(total_input_mass - total_output_mass) / total_input_mass * 100.0
         
-        results["mass_balance"] = {{
+        results["mass_balance"] = {
             "total_input_mass": float(total_input_mass),
             "total_output_mass": float(total_output_mass),
             "error_percent": float(mass_balance_error)
-        }}
+        }
         
         # Energy balance would require more detailed calculations
         # Simplified version:
@@ -249,32 +188,145 @@ try:
             if "cooling_demand" in unit_data["parameters"]:
                 total_energy_out += unit_data["parameters"]["cooling_demand"]
         
-        results["energy_balance"] = {{
+        results["energy_balance"] = {
             "total_energy_in": float(total_energy_in),
             "total_energy_out": float(total_energy_out)
-        }}
+        }
     
     # Save results
-    with open(results_path, 'w') as f:
-        json.dump(results, f, indent=2)
+    write_results(results)
     
-    print(f"Results saved to: {{results_path}}")
+    print(f"Results saved to: {results_path}")
     
 except Exception as e:
     # Handle any unexpected errors
-    error_info = {{
+    error_info = {
         "status": "error",
         "message": str(e),
         "traceback": traceback.format_exc()
-    }}
+    }
     
     try:
-        with open(results_path, 'w') as f:
-            json.dump(error_info, f, indent=2)
+        write_results(error_info)
     except:
         print("Failed to write error information to results file")
         print(traceback.format_exc())
-"""
+""")
+
+@functools.lru_cache(maxsize=256)
+def _render_script(model_path: str, results_path: str, dwsim_path: str, calculation_mode: str) -> str:
+    """
+    Render the automation script, memoized for models that are simulated again.
+
+    Args:
+        model_path: Path to the DWSIM model file
+        results_path: Path to save simulation results
+        dwsim_path: Path to the DWSIM installation
+        calculation_mode: DWSIM calculation mode
+
+    Returns:
+        str: Python script for DWSIM automation
+    """
+    return _SCRIPT_TMPL.substitute(
+        # JSON string literals are valid Python string literals and take
+        # care of escaping backslashes and quotes in paths
+        model_path=json.dumps(model_path),
+        results_path=json.dumps(results_path),
+        dwsim_path=json.dumps(dwsim_path),
+        calculation_mode=json.dumps(calculation_mode)
+    )
+
+class DWSIMSimulator:
+    """
+    Interface to the DWSIM process simulator.
+    """
+    
+    # Installations already validated in this process, keyed by (dwsim_path, is_linux)
+    _validated_installations = set()
+    
+    def __init__(
+        self,
+        dwsim_path: str,
+        property_package: str = "NRTL",
+        calculation_mode: str = "Sequential",
+        timeout: int = 300
+    ):
+        """
+        Initialize the DWSIM simulator interface.
+        
+        Args:
+            dwsim_path: Path to the DWSIM installation
+            property_package: Thermodynamic property package to use
+            calculation_mode: DWSIM calculation mode (Sequential or Equation-Oriented)
+            timeout: Maximum simulation runtime in seconds
+        """
+        self.logger = get_logger(__name__)
+        self.dwsim_path = dwsim_path
+        self.property_package = property_package
+        self.calculation_mode = calculation_mode
+        self.timeout = timeout
+        
+        # Check if running on Linux and set up mono if needed
+        self.is_linux = platform.system() == "Linux"
+        
+        # Validate DWSIM installation once per process; batch harnesses that
+        # have checked it themselves can skip it with DWSIM_SKIP_VALIDATE=1
+        installation = (self.dwsim_path, self.is_linux)
+        if os.environ.get("DWSIM_SKIP_VALIDATE") == "1":
+            self.logger.debug("Skipping DWSIM installation validation")
+        elif installation not in DWSIMSimulator._validated_installations:
+            self._validate_dwsim_installation()
+            DWSIMSimulator._validated_installations.add(installation)
+    
+    def _validate_dwsim_installation(self) -> None:
+        """
+        Validate that the DWSIM installation is accessible.
+        
+        Raises:
+            FileNotFoundError: If DWSIM is not found
+        """
+        if self.is_linux:
+            # Check for DWSIM on Linux
+            if not os.path.exists(self.dwsim_path):
+                self.logger.error(f"DWSIM installation not found at: {self.dwsim_path}")
+                raise FileNotFoundError(f"DWSIM installation not found at: {self.dwsim_path}")
+            
+            # Check for mono installation
+            try:
+                process = subprocess.run(["mono", "--version"], 
+                                        stdout=subprocess.PIPE, 
+                                        stderr=subprocess.PIPE,
+                                        check=False)
+                if process.returncode != 0:
+                    self.logger.error("Mono runtime not found. Please install mono-complete.")
+                    raise RuntimeError("Mono runtime not found. Please install mono-complete.")
+                else:
+                    mono_version = process.stdout.decode('utf-8').split('\n')[0]
+                    self.logger.info(f"Found Mono runtime: {mono_version}")
+            except FileNotFoundError:
+                self.logger.error("Mono runtime not found. Please install mono-complete.")
+                raise RuntimeError("Mono runtime not found. Please install mono-complete.")
+        else:
+            # Check for DWSIM on Windows
+            dwsim_exe = os.path.join(self.dwsim_path, "DWSIM.exe")
+            if not os.path.exists(dwsim_exe):
+                self.logger.error(f"DWSIM executable not found at: {dwsim_exe}")
+                raise FileNotFoundError(f"DWSIM executable not found at: {dwsim_exe}")
+        
+        self.logger.info(f"DWSIM installation validated at: {self.dwsim_path}")
+    
+    def _get_dwsim_automation_script(self, model_path: str, results_path: str) -> str:
+        """
+        Generate a Python script for automating DWSIM through its API.
+        
+        Args:
+            model_path: Path to the DWSIM model file
+            results_path: Path to save simulation results
+            
+        Returns:
+            str: Python script for DWSIM automation
+        """
+        return _render_script(model_path, results_path, self.dwsim_path, self.calculation_mode)
     
     def run_simulation(self, model_path: str) -> Dict[str, Any]:
         """
@@ -300,13 +352,17 @@ except Exception as e:
         
         # Create automation script
         script_content = self._get_dwsim_automation_script(model_path, results_path)
-        script_path = os.path.join(os.path.dirname(model_path), "run_simulation.py")
-        
-        with open(script_path, "w") as f:
-            f.write(script_content)
+        # Name the script after its content so that an identical script left
+        # by a previous run is reused instead of being rewritten
+        digest = hashlib.sha1(script_content.encode("utf-8")).hexdigest()
+        script_path = os.path.join(os.path.dirname(model_path), f"run_simulation_{digest}.py")
         
-        # Make the script executable
-        os.chmod(script_path, 0o755)
+        if not os.path.exists(script_path):
+            with open(script_path, "w") as f:
+                f.write(script_content)
+            
+            # Make the script executable
+            os.chmod(script_path, 0o755)
         
         # Run the simulation script
         self.logger.info("Starting DWSIM simulation...")
@@ -354,8 +410,7 @@ except Exception as e:
         
         # Read simulation results
         if os.path.exists(results_path):
-            with open(results_path, "r") as f:
-                results = json.load(f)
+            results = json_utils.load_file(results_path)
             
             elapsed_time = time.time() - start_time
             self.logger.info(f"Simulation completed in {elapsed_time:.2f} seconds")
@@ -367,4 +422,43 @@ except Exception as e:
             return results
         else:
             self.logger.error("Simulation results file not found")
-            raise RuntimeError("Simulation results file not found")
\ No newline at end of file
+            raise RuntimeError("Simulation results file not found")
+    
+    def run_simulations(
+        self,
+        model_paths: Iterable[str],
+        max_workers: Optional[int] = None
+    ) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Run several DWSIM simulations in parallel.
+        
+        Every simulation is a separate DWSIM process, so the worker threads only
+        wait on subprocesses. Models must be in different directories, since the
+        results of a model are written next to it.
+        
+        Args:
+            model_paths: Paths to the DWSIM model files
+            max_workers: Maximum number of concurrent simulations (defaults to the CPU count)
+            
+        Yields:
+            Tuple of model path and simulation results, in order of completion.
+            A failed simulation yields a result with status "error" and its message.
+            Closing the generator early cancels the simulations not yet started.
+        """
+        model_paths = list(model_paths)
+        workers = max_workers or os.cpu_count() or 1
+        self.logger.info(f"Running {len(model_paths)} DWSIM simulations with up to {workers} in parallel")
+        
+        executor = ThreadPoolExecutor(max_workers=workers)
+        try:
+            futures = {executor.submit(self.run_simulation, path): path for path in model_paths}
+            for future in as_completed(futures):
+                model_path = futures[future]
+                try:
+                    results = future.result()
+                except Exception as e:
+                    results = {"status": "error", "message": str(e)}
+                yield model_path, results
+        finally:
+            # A consumer stopping early only waits for the simulations already running
+            executor.shutdown(cancel_futures=True)
@@ -2,7 +2,15 @@
 Constraint Checker module for validating process designs before DWSIM simulation.
 """
 
-from typing import Dict, Any
+from collections import defaultdict
+from typing import Dict, Any, Union
+
+import numpy as np
+
+from src.dwsim.schema import NormalizedDesign, normalize
+
+# Unit types that need at least one inlet and one outlet
+_FLOW_THROUGH_UNITS = frozenset({"reactor", "distillation_column", "heat_exchanger"})
 
 class ConstraintChecker:
     """
@@ -13,39 +21,49 @@ class ConstraintChecker:
         """Initialize the ConstraintChecker."""
         pass
     
-    def check_mass_balance(self, process_design: Dict[str, Any]) -> bool:
+    def check_mass_balance(self, process_design: Union[Dict[str, Any], NormalizedDesign]) -> bool:
         """
         Verify that mass balance is satisfied across feeds and products.
         
         Args:
-            process_design: Process design dictionary
+            process_design: Process design dictionary, or a design normalized
+                once with schema.normalize to share it between checks
             
         Returns:
             bool: True if mass balance holds, False otherwise
         """
-        total_in = sum(stream.get("mass_flow", 0.0) for stream in process_design.get("feeds", []))
-        total_out = sum(stream.get("mass_flow", 0.0) for stream in process_design.get("products", []))
-        return abs(total_in - total_out) < 1e-6
+        design = normalize(process_design)
+        flows_in = np.array(design.feed_flows, dtype=np.float64)
+        flows_out = np.array(design.product_flows, dtype=np.float64)
+        return bool(abs(flows_in.sum() - flows_out.sum()) < 1e-6)
 
-    def check_stream_connections(self, process_design: Dict[str, Any]) -> bool:
+    def check_stream_connections(self, process_design: Union[Dict[str, Any], NormalizedDesign]) -> bool:
         """
         Ensure all unit operations have required stream connections.
         
         Args:
-            process_design: Process design dictionary
+            process_design: Process design dictionary, or a design normalized
+                once with schema.normalize to share it between checks
             
         Returns:
             bool: True if all connections are valid, False otherwise
         """
-        units = {unit["id"]: unit for unit in process_design.get("unit_operations", [])}
-        connections = process_design.get("connections", [])
+        design = normalize(process_design)
+        units = {unit.id: unit for unit in design.unit_operations}
+
+        # Bucket connections by unit in one pass instead of scanning them per unit
+        inlets_by_unit = defaultdict(list)
+        outlets_by_unit = defaultdict(list)
+        for c in design.connections:
+            inlets_by_unit[c.target].append(c)
+            outlets_by_unit[c.source].append(c)
 
         for unit_id, unit in units.items():
-            unit_type = unit.get("type", "").lower()
-            inlets = [c for c in connections if c.get("to") == unit_id]
-            outlets = [c for c in connections if c.get("from") == unit_id]
+            unit_type = unit.type
+            inlets = inlets_by_unit.get(unit_id, [])
+            outlets = outlets_by_unit.get(unit_id, [])
 
-            if unit_type in ["reactor", "distillation_column", "heat_exchanger"]:
+            if unit_type in _FLOW_THROUGH_UNITS:
                 if not inlets or not outlets:
                     return False
             elif unit_type == "pump":
@@ -54,20 +72,20 @@ class ConstraintChecker:
 
         return True
 
-    def check_parameters(self, process_design: Dict[str, Any]) -> bool:
+    def check_parameters(self, process_design: Union[Dict[str, Any], NormalizedDesign]) -> bool:
         """
         Verify that unit operation parameters are valid.
         
         Args:
-            process_design: Process design dictionary
+            process_design: Process design dictionary, or a design normalized
+                once with schema.normalize to share it between checks
             
         Returns:
             bool: True if parameters are valid, False otherwise
         """
-        for unit in process_design.get("unit_operations", []):
-            unit_type = unit.get("type", "").lower()
-            if unit_type == "reactor" and unit.get("volume", 0.0) <= 0:
+        for unit in normalize(process_design).unit_operations:
+            if unit.type == "reactor" and unit.volume <= 0:
                 return False
-            elif unit_type == "distillation_column" and unit.get("num_trays", 0) <= 0:
+            elif unit.type == "distillation_column" and unit.num_trays <= 0:
                 return False
         return True
\ No newline at end of file
@@ -2,9 +2,21 @@
 Results Analyzer module for processing DWSIM simulation outputs.
 """
 
-import xml.etree.ElementTree as ET
+import sys
 from typing import Dict, Any
 
+import numpy as np
+
+try:
+    from lxml import etree as ET
+    _HAS_LXML = True
+except ImportError:
+    import xml.etree.ElementTree as ET
+    _HAS_LXML = False
+
+# Elements read from simulation output; lxml can skip all others while parsing
+_RESULT_TAGS = ("Stream", "UnitOperation")
+
 class ResultsAnalyzer:
     """
     Analyzes simulation results from DWSIM output files.
@@ -24,27 +36,46 @@ class ResultsAnalyzer:
         Returns:
             Dict containing analyzed results
         """
-        tree = ET.parse(output_file)
-        root = tree.getroot()
         results = {}
-
-        # Extract product stream compositions
         product_comps = {}
-        for stream in root.findall(".//Stream[@Type='Product']"):
-            stream_id = stream.get("ID")
-            comp_elem = stream.find("Composition")
-            if comp_elem is not None:
-                product_comps[stream_id] = {
-                    c.get("Name"): float(c.get("MoleFraction", 0.0))
-                    for c in comp_elem.findall("Compound")
-                }
-        results["product_compositions"] = product_comps
-
-        # Extract energy consumption (example for heat exchangers)
         energy_use = 0.0
-        for unit in root.findall(".//UnitOperation[@Type='HeatExchanger']"):
-            heat_duty = float(unit.find("HeatDuty").text or 0.0)
-            energy_use += abs(heat_duty)
+
+        # Stream the document instead of building the whole tree: only product
+        # streams and heat exchangers are needed, and each element is discarded
+        # as soon as it has been read
+        # Both parsers intern tag and attribute names; lxml additionally skips the
+        # ID hash table it would otherwise build for the whole document
+        if _HAS_LXML:
+            events = ET.iterparse(output_file, events=("end",), tag=_RESULT_TAGS, collect_ids=False)
+        else:
+            events = ET.iterparse(output_file, events=("end",))
+        
+        for _, elem in events:
+            if elem.tag == "Stream":
+                # Extract product stream compositions
+                if elem.get("Type") == "Product":
+                    comp_elem = elem.find("Composition")
+                    if comp_elem is not None:
+                        # Compound names repeat in every product stream; share one copy
+                        product_comps[elem.get("ID")] = {
+                            sys.intern(c.get("Name", "")): float(c.get("MoleFraction", 0.0))
+                            for c in comp_elem.iterfind("Compound")
+                        }
+            elif elem.tag == "UnitOperation":
+                # Extract energy consumption (example for heat exchangers)
+                if elem.get("Type") == "HeatExchanger":
+                    heat_duty = float(elem.find("HeatDuty").text or 0.0)
+                    energy_use += abs(heat_duty)
+            else:
+                continue
+
+            elem.clear()
+            if _HAS_LXML:
+                # lxml keeps cleared siblings attached to the parent; drop them too
+                while elem.getprevious() is not None:
+                    del elem.getparent()[0]
+
+        results["product_compositions"] = product_comps
         results["total_energy_use"] = energy_use
 
         return results
@@ -60,10 +91,19 @@ class ResultsAnalyzer:
         Returns:
             bool: True if targets are met, False otherwise
         """
-        for stream_id, target_comp in targets.get("product_compositions", {}).items():
-            actual_comp = results["product_compositions"].get(stream_id, {})
-            for comp_name, target_value in target_comp.items():
-                actual_value = actual_comp.get(comp_name, 0.0)
-                if abs(actual_value - target_value) > 0.01:  # 1% tolerance
-                    return False
-        return Truex
\ No newline at end of file
+        target_comps = targets.get("product_compositions", {})
+        actual_comps = results["product_compositions"]
+
+        # Align actual and target mole fractions by stream and compound
+        target_values = np.fromiter(
+            (value for target_comp in target_comps.values() for value in target_comp.values()),
+            dtype=np.float64
+        )
+        actual_values = np.fromiter(
+            (actual_comps.get(stream_id, {}).get(comp_name, 0.0)
+             for stream_id, target_comp in target_comps.items() for comp_name in target_comp),
+            dtype=np.float64
+        )
+        if np.any(np.abs(actual_values - target_values) > 0.01):  # 1% tolerance
+            return False
+        return True
\ No newline at end of file
@@ -2,23 +2,118 @@
 Data Handler module for loading, saving, and processing input/output data.
 """
 
+import asyncio
+import functools
 import json
 import os
 import logging
-import jsonschema
-from typing import Dict, Any, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Mapping, Optional, Tuple
+from src.utils import json_utils
 from src.utils.logger import get_logger
 
+if TYPE_CHECKING:
+    import numpy as np
+    from numpy.typing import ArrayLike
+
+try:
+    import fastjsonschema
+except ImportError:
+    fastjsonschema = None
+
+logger = get_logger(__name__)
+
+# Keys every raw material and product entry must have, in the order they are reported
+_MATERIAL_KEYS = ("name", "formula", "amount", "unit", "state")
+_PRODUCT_KEYS = ("name", "formula", "min_purity", "min_yield", "target_production_rate", "unit")
+_MATERIAL_KEY_SET = frozenset(_MATERIAL_KEYS)
+_PRODUCT_KEY_SET = frozenset(_PRODUCT_KEYS)
+
+# JSON Schemas of the input files, compiled into validators when fastjsonschema is installed
+_RAW_MATERIALS_SCHEMA = {
+    "type": "object",
+    "required": ["materials"],
+    "properties": {
+        "materials": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "required": list(_MATERIAL_KEYS)
+            }
+        }
+    }
+}
+
+_PRODUCT_SPECS_SCHEMA = {
+    "type": "object",
+    "required": ["products"],
+    "properties": {
+        "products": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "required": list(_PRODUCT_KEYS)
+            }
+        }
+    }
+}
+
+# Schemas are never modified after import, so compiled validators can be
+# cached by schema name for the lifetime of the process
+_SCHEMAS = {
+    "raw_materials": _RAW_MATERIALS_SCHEMA,
+    "product_specs": _PRODUCT_SPECS_SCHEMA
+}
+
+@functools.lru_cache(maxsize=None)
+def _get_validator(schema_id: str) -> Callable[[Any], Any]:
+    """
+    Compile the validator for an input file schema, once per process.
+    
+    Args:
+        schema_id: Name of the schema in _SCHEMAS
+        
+    Returns:
+        The compiled validator
+    """
+    return fastjsonschema.compile(_SCHEMAS[schema_id])
+
+# Unit conversions as (scale, offset) pairs: converted = value * scale + offset
+_CONVERSIONS = {
+    # Temperature
+    ("C", "K"): (1.0, 273.15),
+    ("K", "C"): (1.0, -273.15),
+    ("F", "K"): (5 / 9, 459.67 * 5 / 9),
+    ("K", "F"): (9 / 5, -459.67),
+    ("F", "C"): (5 / 9, -32 * 5 / 9),
+    ("C", "F"): (9 / 5, 32.0),
+    # Pressure
+    ("kPa", "bar"): (1 / 100, 0.0),
+    ("bar", "kPa"): (100.0, 0.0),
+    ("psi", "kPa"): (6.89476, 0.0),
+    ("kPa", "psi"): (1 / 6.89476, 0.0),
+    ("bar", "psi"): (14.5038, 0.0),
+    ("psi", "bar"): (1 / 14.5038, 0.0)
+}
+
+# Flow rate conversions that depend on the substance, approximated with a
+# molecular weight of 20 kg/kmol until the actual one is used
+_ROUGH_CONVERSIONS = {
+    ("kmol/h", "kg/h"): (20.0, 0.0),
+    ("kg/h", "kmol/h"): (1 / 20, 0.0)
+}
+
+# Directories save_simulation_results has already created. Concurrent savers can
+# at worst both call makedirs(exist_ok=True), which is harmless, so no lock is needed
+_KNOWN_DIRS = set()
+
 class DataHandler:
     """
     Handles input and output data operations for the Chemical Process Design Agent.
     """
     
-    def __init__(self):
-        """Initialize the DataHandler."""
-        self.logger = get_logger(__name__)
-    
-    def load_raw_materials(self, file_path: str) -> Dict[str, Any]:
+    def load_raw_materials(self, file_path: str) -> Mapping[str, Any]:
         """
         Load raw materials data from a JSON file.
         
@@ -26,33 +121,33 @@ class DataHandler:
             file_path: Path to the raw materials JSON file
             
         Returns:
-            Dictionary containing the raw materials data
+            Read-only mapping containing the raw materials data. Only the top
+            level is read-only; nested dicts and lists are shared between
+            loads of the same file as well and must not be mutated.
         
         Raises:
             FileNotFoundError: If the file does not exist
             json.JSONDecodeError: If the file is not valid JSON
         """
-        self.logger.info(f"Loading raw materials from {file_path}")
+        logger.info("Loading raw materials from %s", file_path)
         
         try:
-            with open(file_path, 'r') as f:
-                data = json.load(f)
-            
-            # Validate the data structure
-            self._validate_raw_materials(data)
-            return data
+            # Parsed and validated once per file version; later loads of an
+            # unchanged file return the same read-only mapping
+            stat = os.stat(file_path)
+            return self._load_validated(file_path, stat.st_mtime_ns, stat.st_size, self._validate_raw_materials)
             
         except FileNotFoundError:
-            self.logger.error(f"Raw materials file not found: {file_path}")
+            logger.error("Raw materials file not found: %s", file_path)
             raise
         except json.JSONDecodeError as e:
-            self.logger.error(f"Invalid JSON in raw materials file: {e}")
+            logger.error("Invalid JSON in raw materials file: %s", e)
             raise
         except Exception as e:
-            self.logger.error(f"Error loading raw materials: {e}")
+            logger.error("Error loading raw materials: %s", e)
             raise
     
-    def load_product_specs(self, file_path: str) -> Dict[str, Any]:
+    def load_product_specs(self, file_path: str) -> Mapping[str, Any]:
         """
         Load product specifications from a JSON file.
         
@@ -60,54 +155,150 @@ class DataHandler:
             file_path: Path to the product specifications JSON file
             
         Returns:
-            Dictionary containing the product specifications
+            Read-only mapping containing the product specifications. Only the top
+            level is read-only; nested dicts and lists are shared between
+            loads of the same file as well and must not be mutated.
         
         Raises:
             FileNotFoundError: If the file does not exist
             json.JSONDecodeError: If the file is not valid JSON
         """
-        self.logger.info(f"Loading product specifications from {file_path}")
+        logger.info("Loading product specifications from %s", file_path)
         
         try:
-            with open(file_path, 'r') as f:
-                data = json.load(f)
-            
-            # Validate the data structure
-            self._validate_product_specs(data)
-            return data
+            # Parsed and validated once per file version; later loads of an
+            # unchanged file return the same read-only mapping
+            stat = os.stat(file_path)
+            return self._load_validated(file_path, stat.st_mtime_ns, stat.st_size, self._validate_product_specs)
             
         except FileNotFoundError:
-            self.logger.error(f"Product specifications file not found: {file_path}")
+            logger.error("Product specifications file not found: %s", file_path)
             raise
         except json.JSONDecodeError as e:
-            self.logger.error(f"Invalid JSON in product specifications file: {e}")
+            logger.error("Invalid JSON in product specifications file: %s", e)
             raise
         except Exception as e:
-            self.logger.error(f"Error loading product specifications: {e}")
+            logger.error("Error loading product specifications: %s", e)
             raise
     
-    def save_simulation_results(self, results: Dict[str, Any], file_path: str) -> None:
+    async def load_all(
+        self,
+        raw_materials_path: str,
+        product_specs_path: str
+    ) -> Tuple[Mapping[str, Any], Mapping[str, Any]]:
+        """
+        Load raw materials and product specifications concurrently.
+        
+        Args:
+            raw_materials_path: Path to the raw materials JSON file
+            product_specs_path: Path to the product specifications JSON file
+            
+        Returns:
+            Tuple of raw materials data and product specifications
+        
+        Raises:
+            FileNotFoundError: If a file does not exist
+            json.JSONDecodeError: If a file is not valid JSON
+        """
+        raw_materials, product_specs = await asyncio.gather(
+            asyncio.to_thread(self.load_raw_materials, raw_materials_path),
+            asyncio.to_thread(self.load_product_specs, product_specs_path)
+        )
+        return raw_materials, product_specs
+    
+    def load_all_sync(
+        self,
+        raw_materials_path: str,
+        product_specs_path: str
+    ) -> Tuple[Mapping[str, Any], Mapping[str, Any]]:
+        """
+        Load raw materials and product specifications concurrently, for callers
+        without a running event loop.
+        
+        Args:
+            raw_materials_path: Path to the raw materials JSON file
+            product_specs_path: Path to the product specifications JSON file
+            
+        Returns:
+            Tuple of raw materials data and product specifications
+        
+        Raises:
+            FileNotFoundError: If a file does not exist
+            json.JSONDecodeError: If a file is not valid JSON
+        """
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            raw_materials = executor.submit(self.load_raw_materials, raw_materials_path)
+            product_specs = executor.submit(self.load_product_specs, product_specs_path)
+            return raw_materials.result(), product_specs.result()
+    
+    @staticmethod
+    @functools.lru_cache(maxsize=32)
+    def _load_validated(
+        file_path: str,
+        mtime_ns: int,
+        size: int,
+        validate: Callable[[Dict[str, Any]], None]
+    ) -> Mapping[str, Any]:
+        """
+        Load and validate a JSON input file, cached by file path and version.
+        
+        The view is shallow: nested dicts and lists are the cached objects
+        themselves, shared by every caller loading the same file version.
+        
+        Args:
+            file_path: Path to the JSON file
+            mtime_ns: Modification time of the file, so that edits invalidate the cache
+            size: Size of the file, guarding against coarse modification times
+            validate: Validator raising ValueError for invalid data
+            
+        Returns:
+            Read-only view of the loaded data
+        """
+        data = json_utils.load_file(file_path)
+        validate(data)
+        return MappingProxyType(data)
+    
+    def save_simulation_results(
+        self,
+        results: Dict[str, Any],
+        file_path: str,
+        streaming: bool = False,
+        pretty: bool = False
+    ) -> None:
         """
         Save simulation results to a JSON file.
         
+        Results are written as compact JSON, which is smaller and faster to
+        produce; pass pretty=True for files meant to be read by people.
+        
         Args:
             results: Simulation results dictionary
             file_path: Path to save the results
+            streaming: Write one top-level entry at a time, keeping memory use
+                low for very large results (always compact)
+            pretty: Indent the JSON with two spaces
         """
-        self.logger.info(f"Saving simulation results to {file_path}")
+        logger.info("Saving simulation results to %s", file_path)
         
         try:
-            # Create directory if it doesn't exist
-            os.makedirs(os.path.dirname(file_path), exist_ok=True)
+            # Create directory if it doesn't exist, once per directory; a bare
+            # file name is written to the working directory
+            directory = os.path.dirname(file_path)
+            if directory and directory not in _KNOWN_DIRS:
+                os.makedirs(directory, exist_ok=True)
+                _KNOWN_DIRS.add(directory)
             
-            with open(file_path, 'w') as f:
-                json.dump(results, f, indent=2)
+            if streaming:
+                json_utils.dump_file_streaming(results, file_path)
+            else:
+                json_utils.dump_file(results, file_path, indent=pretty)
                 
         except Exception as e:
-            self.logger.error(f"Error saving simulation results: {e}")
+            logger.error("Error saving simulation results: %s", e)
             raise
     
-    def _validate_raw_materials(self, data: Dict[str, Any]) -> None:
+    @staticmethod
+    def _validate_raw_materials(data: Dict[str, Any]) -> None:
         """
         Validate the raw materials data structure.
         
@@ -117,6 +308,13 @@ class DataHandler:
         Raises:
             ValueError: If the data does not match the expected structure
         """
+        if fastjsonschema is not None:
+            try:
+                _get_validator("raw_materials")(data)
+            except fastjsonschema.JsonSchemaException as e:
+                raise ValueError(f"Invalid raw materials data: {e}") from e
+            return
+        
         # Basic structure validation
         if not isinstance(data, dict):
             raise ValueError("Raw materials data must be a dictionary")
@@ -132,12 +330,13 @@ class DataHandler:
             if not isinstance(material, dict):
                 raise ValueError(f"Material {i} must be a dictionary")
             
-            required_keys = ["name", "formula", "amount", "unit", "state"]
-            for key in required_keys:
-                if key not in material:
-                    raise ValueError(f"Material {i} ({material.get('name', 'unnamed')}) is missing required key '{key}'")
+            # One C-level superset test per entry; the missing key is only looked up on failure
+            if not material.keys() >= _MATERIAL_KEY_SET:
+                key = next(key for key in _MATERIAL_KEYS if key not in material)
+                raise ValueError(f"Material {i} ({material.get('name', 'unnamed')}) is missing required key '{key}'")
     
-    def _validate_product_specs(self, data: Dict[str, Any]) -> None:
+    @staticmethod
+    def _validate_product_specs(data: Dict[str, Any]) -> None:
         """
         Validate the product specifications data structure.
         
@@ -147,6 +346,13 @@ class DataHandler:
         Raises:
             ValueError: If the data does not match the expected structure
         """
+        if fastjsonschema is not None:
+            try:
+                _get_validator("product_specs")(data)
+            except fastjsonschema.JsonSchemaException as e:
+                raise ValueError(f"Invalid product specifications data: {e}") from e
+            return
+        
         # Basic structure validation
         if not isinstance(data, dict):
             raise ValueError("Product specifications data must be a dictionary")
@@ -162,10 +368,9 @@ class DataHandler:
             if not isinstance(product, dict):
                 raise ValueError(f"Product {i} must be a dictionary")
             
-            required_keys = ["name", "formula", "min_purity", "min_yield", "target_production_rate", "unit"]
-            for key in required_keys:
-                if key not in product:
-                    raise ValueError(f"Product {i} ({product.get('name', 'unnamed')}) is missing required key '{key}'")
+            if not product.keys() >= _PRODUCT_KEY_SET:
+                key = next(key for key in _PRODUCT_KEYS if key not in product)
+                raise ValueError(f"Product {i} ({product.get('name', 'unnamed')}) is missing required key '{key}'")
     
     def convert_units(self, value: float, from_unit: str, to_unit: str) -> float:
         """
@@ -182,46 +387,92 @@ class DataHandler:
         Raises:
             ValueError: If the unit conversion is not supported
         """
-        # Temperature conversions
-        if from_unit == "C" and to_unit == "K":
-            return value + 273.15
-        elif from_unit == "K" and to_unit == "C":
-            return value - 273.15
-        elif from_unit == "F" and to_unit == "K":
-            return (value + 459.67) * 5/9
-        elif from_unit == "K" and to_unit == "F":
-            return value * 9/5 - 459.67
-        elif from_unit == "F" and to_unit == "C":
-            return (value - 32) * 5/9
-        elif from_unit == "C" and to_unit == "F":
-            return value * 9/5 + 32
-        
-        # Pressure conversions
-        elif from_unit == "kPa" and to_unit == "bar":
-            return value / 100
-        elif from_unit == "bar" and to_unit == "kPa":
-            return value * 100
-        elif from_unit == "psi" and to_unit == "kPa":
-            return value * 6.89476
-        elif from_unit == "kPa" and to_unit == "psi":
-            return value / 6.89476
-        elif from_unit == "bar" and to_unit == "psi":
-            return value * 14.5038
-        elif from_unit == "psi" and to_unit == "bar":
-            return value / 14.5038
-        
-        # Flow rate conversions (rough approximations, depends on substance)
-        elif from_unit == "kmol/h" and to_unit == "kg/h":
-            # Need molecular weight for true conversion, using rough value
-            self.logger.warning("Converting kmol/h to kg/h without specific molecular weight")
-            return value * 20  # Rough approximation, should be replaced with actual calculation
-        elif from_unit == "kg/h" and to_unit == "kmol/h":
-            self.logger.warning("Converting kg/h to kmol/h without specific molecular weight")
-            return value / 20  # Rough approximation
-        
-        # Same units
-        elif from_unit == to_unit:
+        if from_unit == to_unit:
             return value
         
+        scale, offset = self._conversion_factors(from_unit, to_unit)
+        return value * scale + offset
+    
+    def make_converter(self, from_unit: str, to_unit: str) -> Callable[[float], float]:
+        """
+        Build a conversion function for a fixed pair of units.
+        
+        The unit lookup happens once here, so the returned function only does
+        the arithmetic; use it for converting many values between the same units.
+        
+        Args:
+            from_unit: The source unit
+            to_unit: The target unit
+            
+        Returns:
+            Function converting a value from from_unit to to_unit
+        
+        Raises:
+            ValueError: If the unit conversion is not supported
+        """
+        if from_unit == to_unit:
+            return lambda value: value
+        
+        scale, offset = self._conversion_factors(from_unit, to_unit)
+        if not offset:
+            return lambda value: value * scale
+        return lambda value: value * scale + offset
+    
+    def convert_units_array(
+        self,
+        values: "ArrayLike",
+        from_unit: str,
+        to_unit: str,
+        out: Optional["np.ndarray"] = None
+    ) -> "np.ndarray":
+        """
+        Convert an array of values from one unit to another in a single vectorized pass.
+        
+        Args:
+            values: The values to convert (array or sequence of numbers)
+            from_unit: The source unit
+            to_unit: The target unit
+            out: Optional float64 array to write the result to, avoiding an allocation
+            
+        Returns:
+            The converted values as a float64 array
+        
+        Raises:
+            ValueError: If the unit conversion is not supported
+        """
+        # NumPy is only needed here; keep it off the import path of the CLI
+        import numpy as np
+        
+        values = np.asarray(values, dtype=np.float64)
+        if from_unit == to_unit:
+            scale, offset = 1.0, 0.0
         else:
-            raise ValueError(f"Unsupported unit conversion: {from_unit} to {to_unit}")
\ No newline at end of file
+            scale, offset = self._conversion_factors(from_unit, to_unit)
+        
+        result = np.multiply(values, scale, out=out)
+        if offset:
+            result += offset
+        return result
+    
+    def _conversion_factors(self, from_unit: str, to_unit: str) -> Tuple[float, float]:
+        """
+        Look up the scale and offset converting between two different units.
+        
+        Args:
+            from_unit: The source unit
+            to_unit: The target unit
+            
+        Returns:
+            Tuple of scale and offset
+        
+        Raises:
+            ValueError: If the unit conversion is not supported
+        """
+        factors = _CONVERSIONS.get((from_unit, to_unit))
+        if factors is None:
+            if (from_unit, to_unit) not in _ROUGH_CONVERSIONS:
+                raise ValueError(f"Unsupported unit conversion: {from_unit} to {to_unit}")
+            # Need molecular weight for true conversion, using rough value
+            logger.warning("Converting %s to %s without specific molecular weight", from_unit, to_unit)
+            factors = _ROUGH_CONVERSIONS[(from_unit, to_unit)]
+        return factors
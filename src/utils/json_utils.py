@@ -0,0 +1,166 @@
+"""
+JSON utility module for the Chemical Process Design Agent.
+Uses orjson when it is installed and falls back to the standard library otherwise.
+"""
+
+import json
+import mmap
+import os
+from typing import Any, Mapping, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Files larger than this are memory-mapped rather than read when parsing with orjson;
+# below it the mapping setup costs more than the copy it saves
+_MMAP_THRESHOLD = 1 << 20
+
+def _default(obj: Any) -> Any:
+    """
+    Serialize mappings other than dict, such as the read-only views returned by loaders.
+
+    Args:
+        obj: An object the serializer does not support natively
+
+    Returns:
+        A dict with the same items
+
+    Raises:
+        TypeError: If the object is not a mapping
+    """
+    if isinstance(obj, Mapping):
+        return dict(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+def dumpb(obj: Any, indent: bool = False, sort_keys: bool = False) -> bytes:
+    """
+    Serialize an object to UTF-8 encoded JSON.
+
+    Args:
+        obj: The object to serialize
+        indent: Pretty-print with two-space indentation
+        sort_keys: Sort object keys, giving a canonical form for hashing
+
+    Returns:
+        The JSON document as bytes
+    """
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        try:
+            return orjson.dumps(obj, default=_default, option=option)
+        except TypeError:
+            # Leave types orjson does not support to the standard library
+            pass
+
+    if indent:
+        return json.dumps(obj, indent=2, sort_keys=sort_keys, default=_default).encode("utf-8")
+    return json.dumps(obj, separators=(",", ":"), sort_keys=sort_keys, default=_default).encode("utf-8")
+
+def dumps(obj: Any, indent: bool = False, sort_keys: bool = False) -> str:
+    """
+    Serialize an object to a JSON string.
+
+    Args:
+        obj: The object to serialize
+        indent: Pretty-print with two-space indentation
+        sort_keys: Sort object keys, giving a canonical form for hashing
+
+    Returns:
+        The JSON string
+    """
+    return dumpb(obj, indent=indent, sort_keys=sort_keys).decode("utf-8")
+
+def dump_file(obj: Any, path: str, indent: bool = False, drop_cache: bool = False) -> None:
+    """
+    Serialize an object to a JSON file.
+
+    The document is serialized in memory and written with as few write(2)
+    calls as possible, bypassing Python's buffered file layer.
+
+    Args:
+        obj: The object to serialize
+        path: Path of the file to write
+        indent: Pretty-print with two-space indentation
+        drop_cache: Advise the OS to evict the written pages from the page cache,
+            for large write-once files that are not read back (POSIX only)
+    """
+    data = memoryview(dumpb(obj, indent=indent))
+    # O_BINARY prevents newline translation on Windows
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0), 0o644)
+    try:
+        while data:
+            data = data[os.write(fd, data):]
+        if drop_cache and hasattr(os, "posix_fadvise"):
+            # Dirty pages are only dropped once written back, so flush first
+            os.fdatasync(fd)
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+    finally:
+        os.close(fd)
+
+def dump_file_streaming(obj: Mapping[Any, Any], path: str) -> None:
+    """
+    Serialize a mapping to a compact JSON file one top-level value at a time.
+
+    Only one top-level value is held in serialized form at any time, so peak
+    memory is bounded by the largest value rather than the whole document.
+
+    Args:
+        obj: The mapping to serialize
+        path: Path of the file to write
+    """
+    with open(path, "wb", buffering=1 << 20) as f:
+        f.write(b"{")
+        for i, (key, value) in enumerate(obj.items()):
+            if i:
+                f.write(b",")
+            f.write(dumpb(str(key)))
+            f.write(b":")
+            f.write(dumpb(value))
+        f.write(b"}")
+
+def loads(data: Union[str, bytes]) -> Any:
+    """
+    Deserialize a JSON document.
+
+    Args:
+        data: The JSON document as str or bytes
+
+    Returns:
+        The deserialized object
+
+    Raises:
+        json.JSONDecodeError: If the document is not valid JSON
+    """
+    if orjson is not None:
+        # orjson.JSONDecodeError is a subclass of json.JSONDecodeError
+        return orjson.loads(data)
+    return json.loads(data)
+
+def load_file(path: str) -> Any:
+    """
+    Deserialize a JSON file.
+
+    Args:
+        path: Path of the file to read
+
+    Returns:
+        The deserialized object
+
+    Raises:
+        FileNotFoundError: If the file does not exist
+        json.JSONDecodeError: If the file is not valid JSON
+    """
+    with open(path, "rb") as f:
+        if orjson is not None and os.fstat(f.fileno()).st_size > _MMAP_THRESHOLD:
+            # Parse straight from the page cache instead of copying the file into a bytes object
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as view:
+                return orjson.loads(view)
+        # read() on a binary file is already a single read into a buffer sized
+        # from fstat, so there is no incremental growth to avoid here
+        return loads(f.read())
@@ -1,13 +1,23 @@
 """
 Logging utility module for the Chemical Process Design Agent.
 Provides consistent logging throughout the application.
+
+Log calls on hot paths pass their arguments %-style, e.g.
+logger.info("Loading %s", path), so that the message is only formatted
+when a handler actually emits the record.
 """
 
+import atexit
 import logging
+import logging.handlers
 import os
+import queue
 import sys
 from typing import Optional
 
+# Shared by every handler; Formatter.format does not mutate the formatter
+_FORMATTER = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
 def setup_logger(level: int = logging.INFO) -> logging.Logger:
     """
     Setup and configure the root logger.
@@ -18,14 +28,9 @@ def setup_logger(level: int = logging.INFO) -> logging.Logger:
     Returns:
         The configured root logger
     """
-    # Create formatter
-    formatter = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-    )
-    
     # Setup console handler
     console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setFormatter(formatter)
+    console_handler.setFormatter(_FORMATTER)
     
     # Configure root logger
     root_logger = logging.getLogger()
@@ -51,31 +56,61 @@ def get_logger(name: str) -> logging.Logger:
     """
     return logging.getLogger(name)
 
+class _FileQueueListener(logging.handlers.QueueListener):
+    """Queue listener that may be stopped more than once."""
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._stopped = False
+    
+    def stop(self) -> None:
+        """Write the remaining queued records and end the listener thread, once."""
+        # QueueListener.stop fails when called twice before Python 3.12
+        if self._stopped:
+            return
+        self._stopped = True
+        atexit.unregister(self.stop)
+        super().stop()
+
 def add_file_handler(
     logger: logging.Logger, 
     log_file: str, 
     level: int = logging.INFO
-) -> None:
+) -> logging.handlers.QueueListener:
     """
     Add a file handler to an existing logger.
     
+    Records are written to the file by a background thread, so logging calls
+    only put them on a queue and never wait for disk I/O. Records still queued
+    are written when the returned listener is stopped, which also happens at
+    interpreter exit.
+    
     Args:
         logger: The logger to add the handler to
         log_file: Path to the log file
         level: Logging level for the file handler
+        
+    Returns:
+        The listener writing records to the file; stop() flushes and ends it
     """
-    # Ensure the directory exists
-    os.makedirs(os.path.dirname(log_file), exist_ok=True)
+    # Ensure the directory exists (a bare file name lives in the working directory)
+    log_dir = os.path.dirname(log_file)
+    if log_dir:
+        os.makedirs(log_dir, exist_ok=True)
     
-    # Create file handler
+    # Create file handler, owned by the listener thread
     file_handler = logging.FileHandler(log_file)
     file_handler.setLevel(level)
+    file_handler.setFormatter(_FORMATTER)
+    
+    log_queue = queue.SimpleQueue()
+    listener = _FileQueueListener(log_queue, file_handler, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
     
-    # Create formatter
-    formatter = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-    )
-    file_handler.setFormatter(formatter)
+    # Add the queueing handler to logger
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    queue_handler.setLevel(level)
+    logger.addHandler(queue_handler)
     
-    # Add handler to logger
-    logger.addHandler(file_handler)
\ No newline at end of file
+    return listener
@@ -0,0 +1,54 @@
+"""
+Retry utility module for the Chemical Process Design Agent.
+Retries transient failures of asynchronous calls with exponential backoff.
+"""
+
+import asyncio
+import functools
+import random
+from typing import Any, Awaitable, Callable, Optional, Tuple, Type
+
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+def async_retry(
+    max_attempts: int = 3,
+    base_delay: float = 1.0,
+    max_delay: float = 30.0,
+    jitter: float = 1.0,
+    exceptions: Tuple[Type[BaseException], ...] = (Exception,),
+    retry_if: Optional[Callable[[BaseException], bool]] = None
+) -> Callable[[Callable[..., Awaitable[Any]]], Callable[..., Awaitable[Any]]]:
+    """
+    Decorate a coroutine function to retry it with exponential backoff.
+
+    Args:
+        max_attempts: Maximum number of attempts, including the first
+        base_delay: Delay before the first retry in seconds, doubled on every retry
+        max_delay: Upper bound for the delay between attempts in seconds
+        jitter: Maximum random delay in seconds added to every wait, so that
+            concurrent callers failing together do not retry in lockstep
+        exceptions: Exception types that trigger a retry
+        retry_if: Predicate further restricting which exceptions are retried
+
+    Returns:
+        The decorator
+    """
+    def decorator(func: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            for attempt in range(1, max_attempts + 1):
+                try:
+                    return await func(*args, **kwargs)
+                except exceptions as e:
+                    if attempt == max_attempts or (retry_if is not None and not retry_if(e)):
+                        raise
+                    delay = min(max_delay, base_delay * 2 ** (attempt - 1) + random.uniform(0, jitter))
+                    logger.warning(
+                        f"{func.__qualname__} failed (attempt {attempt}/{max_attempts}): {e}; "
+                        f"retrying in {delay:.1f}s"
+                    )
+                    await asyncio.sleep(delay)
+        return wrapper
+    return decorator